@@ -148,6 +148,15 @@ class Config:
         """
         self._opts[self._k(scope, section, key)] = value
 
+    def add_many(self, scope, items):
+        """
+        Adds or overrides multiple configuration properties within the same scope.
+
+        :param scope: The scope of these properties. More specific scopes (higher values) override more generic ones (lower values).
+        :param items: An iterable of ``(section, key, value)`` tuples.
+        """
+        self._opts.update((self._k(scope, section, key), value) for section, key, value in items)
+
     def add_all(self, source, section):
         """
         Adds all config items within the given `section` from the `source` config object.
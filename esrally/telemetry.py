@@ -16,8 +16,10 @@
 # under the License.
 
 import collections
+import functools
 import logging
 import os
+import sys
 import threading
 
 import tabulate
@@ -154,6 +156,13 @@ class SamplerThread(threading.Thread):
             logging.getLogger(__name__).exception("Could not determine %s", self.recorder)
 
 
+def escape_format(s):
+    """
+    Escapes curly braces so ``s`` can be embedded literally in a ``str.format`` template.
+    """
+    return s.replace("{", "{{").replace("}", "}}")
+
+
 class FlightRecorder(TelemetryDevice):
     internal = False
     command = "jfr"
@@ -190,7 +199,20 @@ class FlightRecorder(TelemetryDevice):
         return java_opts
 
     def java_opts(self, log_file):
-        recording_template = self.telemetry_params.get("recording-template")
+        if self.recording_template:
+            self.logger.info("jfr: Using recording template [%s].", self.recording_template)
+        else:
+            self.logger.info("jfr: Using default recording template.")
+        return [opt.format(log_file=log_file) for opt in self.java_opts_templates]
+
+    @functools.cached_property
+    def recording_template(self):
+        return self.telemetry_params.get("recording-template")
+
+    # only the log file varies between calls so resolve everything else once. This happens lazily because telemetry
+    # parameters are only guaranteed to be present if the device is enabled.
+    @functools.cached_property
+    def java_opts_templates(self):
         java_opts = ["-XX:+UnlockDiagnosticVMOptions", "-XX:+DebugNonSafepoints"]
         jfr_cmd = ""
         if self.java_major_version < 11:
@@ -198,22 +220,14 @@ class FlightRecorder(TelemetryDevice):
 
         if self.java_major_version < 9:
             java_opts.append("-XX:+FlightRecorder")
-            java_opts.append("-XX:FlightRecorderOptions=disk=true,maxage=0s,maxsize=0,dumponexit=true,dumponexitpath={}".format(log_file))
+            java_opts.append("-XX:FlightRecorderOptions=disk=true,maxage=0s,maxsize=0,dumponexit=true,dumponexitpath={log_file}")
             jfr_cmd = "-XX:StartFlightRecording=defaultrecording=true"
-            if recording_template:
-                self.logger.info("jfr: Using recording template [%s].", recording_template)
-                jfr_cmd += ",settings={}".format(recording_template)
-            else:
-                self.logger.info("jfr: Using default recording template.")
         else:
-            jfr_cmd += "-XX:StartFlightRecording=maxsize=0,maxage=0s,disk=true,dumponexit=true,filename={}".format(log_file)
-            if recording_template:
-                self.logger.info("jfr: Using recording template [%s].", recording_template)
-                jfr_cmd += ",settings={}".format(recording_template)
-            else:
-                self.logger.info("jfr: Using default recording template.")
+            jfr_cmd += "-XX:StartFlightRecording=maxsize=0,maxage=0s,disk=true,dumponexit=true,filename={log_file}"
+        if self.recording_template:
+            jfr_cmd += ",settings={}".format(escape_format(str(self.recording_template)))
         java_opts.append(jfr_cmd)
-        return java_opts
+        return tuple(java_opts)
 
 
 class JitCompiler(TelemetryDevice):
@@ -253,14 +267,21 @@ class Gc(TelemetryDevice):
         return self.java_opts(log_file)
 
     def java_opts(self, log_file):
+        return [opt.format(log_file=log_file) for opt in self.java_opts_templates]
+
+    # resolved lazily for the same reason as in FlightRecorder
+    @functools.cached_property
+    def java_opts_templates(self):
         if self.java_major_version < 9:
-            return ["-Xloggc:{}".format(log_file), "-XX:+PrintGCDetails", "-XX:+PrintGCDateStamps", "-XX:+PrintGCTimeStamps",
+            return ("-Xloggc:{log_file}", "-XX:+PrintGCDetails", "-XX:+PrintGCDateStamps", "-XX:+PrintGCTimeStamps",
                     "-XX:+PrintGCApplicationStoppedTime", "-XX:+PrintGCApplicationConcurrentTime",
-                    "-XX:+PrintTenuringDistribution"]
+                    "-XX:+PrintTenuringDistribution")
         else:
             log_config = self.telemetry_params.get("gc-log-config", "gc*=info,safepoint=info,age*=trace")
             # see https://docs.oracle.com/javase/9/tools/java.htm#JSWOR-GUID-BE93ABDC-999C-4CB5-A88B-1994AAAC74D5
-            return [f"-Xlog:{log_config}:file={log_file}:utctime,uptimemillis,level,tags:filecount=0"]
+            xlog_cmd = "-Xlog:{}".format(escape_format(str(log_config)))
+            xlog_cmd += ":file={log_file}:utctime,uptimemillis,level,tags:filecount=0"
+            return (xlog_cmd,)
 
 
 class Heapdump(TelemetryDevice):
@@ -429,17 +450,17 @@ class CcrStatsRecorder:
         :param stats: A dict with returned CCR stats for the index.
         """
 
+        # identical for all shards of this index; the metrics store copies meta-data so it is safe to share
+        shard_metadata = {
+            "cluster": self.cluster_name,
+            "index": name
+        }
         for shard_stats in stats:
             if "shard_id" in shard_stats:
                 doc = {
                     "name": "ccr-stats",
                     "shard": shard_stats
                 }
-                shard_metadata = {
-                    "cluster": self.cluster_name,
-                    "index": name
-                }
-
                 self.metrics_store.put_doc(doc, level=MetaInfoScope.cluster, meta_data=shard_metadata)
 
 
@@ -699,7 +720,8 @@ class NodeStatsRecorder:
                 # Avoid duplication for metric fields that have unit embedded in value as they are also recorded elsewhere
                 # example: `breakers_parent_limit_size_in_bytes` vs `breakers_parent_limit_size`
                 elif isinstance(section_value, (int, float)) and not isinstance(section_value, bool):
-                    yield "{}{}".format(prefix + "_" if prefix else "", section_name), section_value
+                    # every sample produces the same field names; interning lets all buffered docs share one string per name
+                    yield sys.intern("{}{}".format(prefix + "_" if prefix else "", section_name)), section_value
 
         if stats:
             return dict(iterate())
@@ -1244,6 +1266,22 @@ class IndexStats(InternalTelemetryDevice):
     """
     Gathers statistics via the Elasticsearch index stats API
     """
+    # (metric name, path within the primaries' stats)
+    INDEX_TIMES = (
+        ("merges_total_time", ("merges", "total_time_in_millis")),
+        ("merges_total_throttled_time", ("merges", "total_throttled_time_in_millis")),
+        ("indexing_total_time", ("indexing", "index_time_in_millis")),
+        ("indexing_throttle_time", ("indexing", "throttle_time_in_millis")),
+        ("refresh_total_time", ("refresh", "total_time_in_millis")),
+        ("flush_total_time", ("flush", "total_time_in_millis")),
+    )
+
+    INDEX_COUNTS = (
+        ("merges_total_count", ("merges", "total")),
+        ("refresh_total_count", ("refresh", "total")),
+        ("flush_total_count", ("flush", "total")),
+    )
+
     def __init__(self, client, metrics_store):
         super().__init__()
         self.client = client
@@ -1300,55 +1338,47 @@ class IndexStats(InternalTelemetryDevice):
 
     def index_times(self, stats, per_shard_stats=True):
         times = []
-        self.index_time(times, stats, "merges_total_time", ["merges", "total_time_in_millis"], per_shard_stats)
-        self.index_time(times, stats, "merges_total_throttled_time", ["merges", "total_throttled_time_in_millis"], per_shard_stats)
-        self.index_time(times, stats, "indexing_total_time", ["indexing", "index_time_in_millis"], per_shard_stats)
-        self.index_time(times, stats, "indexing_throttle_time", ["indexing", "throttle_time_in_millis"], per_shard_stats)
-        self.index_time(times, stats, "refresh_total_time", ["refresh", "total_time_in_millis"], per_shard_stats)
-        self.index_time(times, stats, "flush_total_time", ["flush", "total_time_in_millis"], per_shard_stats)
-        return times
-
-    def index_time(self, values, stats, name, path, per_shard_stats):
         primary_total_stats = self.extract_value(stats, ["_all", "primaries"], default_value={})
-        value = self.extract_value(primary_total_stats, path)
-        if value is not None:
-            doc = {
-                "name": name,
-                "value": value,
-                "unit": "ms",
-            }
-            if per_shard_stats:
-                doc["per-shard"] = self.primary_shard_stats(stats, path)
-            values.append(doc)
+        # only determined once the first time metric is present
+        primary_shards = None
+        for name, path in IndexStats.INDEX_TIMES:
+            value = self.extract_value(primary_total_stats, path)
+            if value is not None:
+                doc = {
+                    "name": name,
+                    "value": value,
+                    "unit": "ms",
+                }
+                if per_shard_stats:
+                    if primary_shards is None:
+                        primary_shards = self.primary_shards(stats)
+                    doc["per-shard"] = [self.extract_value(shard_metrics, path, default_value=0) for shard_metrics in primary_shards]
+                times.append(doc)
+        return times
 
     def index_counts(self, stats):
         counts = []
-        self.index_count(counts, stats, "merges_total_count", ["merges", "total"])
-        self.index_count(counts, stats, "refresh_total_count", ["refresh", "total"])
-        self.index_count(counts, stats, "flush_total_count", ["flush", "total"])
-        return counts
-
-    def index_count(self, values, stats, name, path):
         primary_total_stats = self.extract_value(stats, ["_all", "primaries"], default_value={})
-        value = self.extract_value(primary_total_stats, path)
-        if value is not None:
-            doc = {
-                "name": name,
-                "value": value
-            }
-            values.append(doc)
+        for name, path in IndexStats.INDEX_COUNTS:
+            value = self.extract_value(primary_total_stats, path)
+            if value is not None:
+                counts.append({
+                    "name": name,
+                    "value": value
+                })
+        return counts
 
-    def primary_shard_stats(self, stats, path):
-        shard_stats = []
+    def primary_shards(self, stats):
+        primary_shards = []
         try:
             for shards in stats["indices"].values():
                 for shard in shards["shards"].values():
                     for shard_metrics in shard:
                         if shard_metrics["routing"]["primary"]:
-                            shard_stats.append(self.extract_value(shard_metrics, path, default_value=0))
+                            primary_shards.append(shard_metrics)
         except KeyError:
-            self.logger.warning("Could not determine primary shard stats at path [%s].", ",".join(path))
-        return shard_stats
+            self.logger.warning("Could not determine primary shards.")
+        return primary_shards
 
     def add_metrics(self, value, metric_key, unit=None):
         if value is not None:
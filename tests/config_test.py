@@ -158,6 +158,19 @@ class ConfigTests(TestCase):
         # nonexisting key will not throw an error
         target_cfg.add_all(source=source_cfg, section="this section does not exist")
 
+    def test_add_many(self):
+        cfg = config.Config(config_file_class=InMemoryConfigStore)
+        cfg.add(config.Scope.application, "tests", "sample.key", "value")
+        cfg.add_many(config.Scope.applicationOverride, [
+            ("tests", "sample.key", "overridden"),
+            ("tests", "sample.key2", "value2"),
+            ("other", "other.key", "other")
+        ])
+
+        self.assertEqual("overridden", cfg.opts("tests", "sample.key"))
+        self.assertEqual("value2", cfg.opts("tests", "sample.key2"))
+        self.assertEqual("other", cfg.opts("other", "other.key"))
+
 
 class AutoLoadConfigTests(TestCase):
     def test_can_create_non_existing_config(self):
@@ -16,7 +16,11 @@
 # under the License.
 
 import collections
+import functools
+import json
+import os
 import random
+import types
 import unittest.mock as mock
 from collections import namedtuple
 from unittest import TestCase
@@ -25,30 +29,87 @@ from unittest.mock import call
 import elasticsearch
 
 from esrally import config, metrics, exceptions, telemetry
-from esrally.mechanic import cluster
 from esrally.metrics import MetaInfoScope
 from esrally.utils import console
 
 
+# all tests only read from the config so it is safe to share one instance
+@functools.lru_cache(maxsize=1)
 def create_config():
     cfg = config.Config()
-    cfg.add(config.Scope.application, "system", "env.name", "unittest")
-    cfg.add(config.Scope.application, "track", "params", {})
-    # concrete path does not matter
-    cfg.add(config.Scope.application, "node", "rally.root", "/some/root/path")
-
-    cfg.add(config.Scope.application, "reporting", "datastore.host", "localhost")
-    cfg.add(config.Scope.application, "reporting", "datastore.port", "0")
-    cfg.add(config.Scope.application, "reporting", "datastore.secure", False)
-    cfg.add(config.Scope.application, "reporting", "datastore.user", "")
-    cfg.add(config.Scope.application, "reporting", "datastore.password", "")
-    # disable version probing to avoid any network calls in tests
-    cfg.add(config.Scope.application, "reporting", "datastore.probe.cluster_version", False)
-    # only internal devices are active
-    cfg.add(config.Scope.application, "telemetry", "devices", [])
+    cfg.add_many(config.Scope.application, [
+        ("system", "env.name", "unittest"),
+        ("track", "params", {}),
+        # concrete path does not matter
+        ("node", "rally.root", "/some/root/path"),
+        ("reporting", "datastore.host", "localhost"),
+        ("reporting", "datastore.port", "0"),
+        ("reporting", "datastore.secure", False),
+        ("reporting", "datastore.user", ""),
+        ("reporting", "datastore.password", ""),
+        # disable version probing to avoid any network calls in tests
+        ("reporting", "datastore.probe.cluster_version", False),
+        # only internal devices are active
+        ("telemetry", "devices", []),
+    ])
     return cfg
 
 
+def rally_node(node_name, pid=None):
+    # telemetry devices only read the PID and the name of a node
+    return types.SimpleNamespace(pid=pid, node_name=node_name)
+
+
+def run_benchmark(device_type, api, stats_at_start, stats_at_end, metrics_store):
+    # the device samples the stats of the given client API at the start and at the end of the benchmark
+    client = Client(**{api: SubClient(stats_at_start)})
+    device = device_type(client, metrics_store)
+    t = telemetry.Telemetry(create_config(), devices=[device])
+    t.on_benchmark_start()
+    setattr(client, api, SubClient(stats_at_end))
+    t.on_benchmark_stop()
+
+
+def load_json_resource(name):
+    with open(os.path.join(os.path.dirname(__file__), "resources", name)) as f:
+        return json.load(f)
+
+
+def deep_freeze(o):
+    # makes fixtures that are shared by several tests read-only at all levels
+    if isinstance(o, dict):
+        return types.MappingProxyType({k: deep_freeze(v) for k, v in o.items()})
+    if isinstance(o, list):
+        return tuple(deep_freeze(v) for v in o)
+    return o
+
+
+def non_positive_sample_interval_error(param):
+    return r"The telemetry parameter '{}' must be greater than zero but was .*\.".format(param)
+
+
+def wrong_cluster_name_error(param, clients):
+    return (r"The telemetry parameter '{}' must be a JSON Object with keys matching "
+            r"the cluster names \[{}] specified in --target-hosts "
+            r"but it had \[wrong_cluster_name\].".format(param, ",".join(sorted(clients.keys()))))
+
+
+class UnorderedList:
+    # matches any list with the same elements irrespective of their order
+    def __init__(self, items):
+        self.items = sorted(items)
+
+    __hash__ = None
+
+    def __eq__(self, other):
+        if not isinstance(other, list):
+            return NotImplemented
+        return sorted(other) == self.items
+
+    def __repr__(self):
+        return "UnorderedList({})".format(self.items)
+
+
 class MockTelemetryDevice(telemetry.InternalTelemetryDevice):
     def __init__(self, mock_java_opts):
         super().__init__()
@@ -75,8 +136,6 @@ class TelemetryTests(TestCase):
 
         opts = t.instrument_candidate_java_opts()
 
-        self.assertIsNotNone(opts)
-        self.assertEqual(len(opts), 3)
         self.assertEqual(["-Xms256M", "-Xmx512M", "-Des.network.host=127.0.0.1"], opts)
 
 
@@ -86,7 +145,7 @@ class StartupTimeTests(TestCase):
     def test_store_calculated_metrics(self, metrics_store_put_value, stop_watch):
         stop_watch.total_time.return_value = 2
         metrics_store = metrics.EsMetricsStore(create_config())
-        node = cluster.Node(None, "/bin", "io", "rally0", None)
+        node = rally_node("rally0")
         startup_time = telemetry.StartupTime()
         # replace with mock
         startup_time.timer = stop_watch
@@ -132,6 +191,13 @@ class SubClient:
         return self._transform_stats()
 
 
+def static_client(cluster_info, nodes_info, nodes_stats=None):
+    # a lightweight alternative to Client for tests that only need fixed responses of the info and nodes APIs
+    return types.SimpleNamespace(info=lambda: cluster_info,
+                                 nodes=types.SimpleNamespace(info=lambda **kwargs: nodes_info,
+                                                             stats=lambda **kwargs: nodes_stats))
+
+
 def wrap(it):
     return it if callable(it) else ResponseSupplier(it)
 
@@ -214,12 +280,19 @@ class JfrTests(TestCase):
                           "-XX:StartFlightRecording=maxsize=0,maxage=0s,disk=true,dumponexit=true,"
                           "filename=/var/log/test-recording.jfr,settings=profile"], java_opts)
 
+    def test_disabled_device_without_telemetry_params_adds_no_options(self):
+        # the launcher also creates disabled devices and telemetry params may be absent then
+        for java_major_version in (8, 10, 11):
+            with self.subTest(java_major_version=java_major_version):
+                jfr = telemetry.FlightRecorder(telemetry_params=None, log_root="/var/log", java_major_version=java_major_version)
+                t = telemetry.Telemetry(enabled_devices=[], devices=[jfr])
+                self.assertEqual([], t.instrument_candidate_java_opts())
+
 
 class GcTests(TestCase):
     def test_sets_options_for_pre_java_9(self):
         gc = telemetry.Gc(telemetry_params={}, log_root="/var/log", java_major_version=random.randint(0, 8))
         gc_java_opts = gc.java_opts("/var/log/defaults-node-0.gc.log")
-        self.assertEqual(7, len(gc_java_opts))
         self.assertEqual(["-Xloggc:/var/log/defaults-node-0.gc.log", "-XX:+PrintGCDetails", "-XX:+PrintGCDateStamps",
                           "-XX:+PrintGCTimeStamps", "-XX:+PrintGCApplicationStoppedTime", "-XX:+PrintGCApplicationConcurrentTime",
                           "-XX:+PrintTenuringDistribution"], gc_java_opts)
@@ -227,7 +300,6 @@ class GcTests(TestCase):
     def test_sets_options_for_java_9_or_above(self):
         gc = telemetry.Gc(telemetry_params={}, log_root="/var/log", java_major_version=random.randint(9, 999))
         gc_java_opts = gc.java_opts("/var/log/defaults-node-0.gc.log")
-        self.assertEqual(1, len(gc_java_opts))
         self.assertEqual(
             ["-Xlog:gc*=info,safepoint=info,age*=trace:file=/var/log/defaults-node-0.gc.log:utctime,uptimemillis,level,tags:filecount=0"],
             gc_java_opts)
@@ -237,11 +309,31 @@ class GcTests(TestCase):
                           log_root="/var/log",
                           java_major_version=random.randint(9, 999))
         gc_java_opts = gc.java_opts("/var/log/defaults-node-0.gc.log")
-        self.assertEqual(1, len(gc_java_opts))
         self.assertEqual(
             ["-Xlog:gc,safepoint:file=/var/log/defaults-node-0.gc.log:utctime,uptimemillis,level,tags:filecount=0"],
             gc_java_opts)
 
+    def test_modifying_options_does_not_affect_later_calls(self):
+        gc = telemetry.Gc(telemetry_params={}, log_root="/var/log", java_major_version=random.randint(9, 999))
+        gc.java_opts("/var/log/defaults-node-0.gc.log").append("-Xmx1g")
+        self.assertEqual(
+            ["-Xlog:gc*=info,safepoint=info,age*=trace:file=/var/log/defaults-node-0.gc.log:utctime,uptimemillis,level,tags:filecount=0"],
+            gc.java_opts("/var/log/defaults-node-0.gc.log"))
+
+    def test_accepts_non_string_options_for_java_9_or_above(self):
+        gc = telemetry.Gc(telemetry_params={"gc-log-config": 1}, log_root="/var/log", java_major_version=random.randint(9, 999))
+        self.assertEqual(
+            ["-Xlog:1:file=/var/log/defaults-node-0.gc.log:utctime,uptimemillis,level,tags:filecount=0"],
+            gc.java_opts("/var/log/defaults-node-0.gc.log"))
+
+    def test_disabled_device_without_telemetry_params_adds_no_options(self):
+        # the launcher also creates disabled devices and telemetry params may be absent then
+        for java_major_version in (8, 9):
+            with self.subTest(java_major_version=java_major_version):
+                gc = telemetry.Gc(telemetry_params=None, log_root="/var/log", java_major_version=java_major_version)
+                t = telemetry.Telemetry(enabled_devices=[], devices=[gc])
+                self.assertEqual([], t.instrument_candidate_java_opts())
+
 
 class HeapdumpTests(TestCase):
     @mock.patch("esrally.utils.process.run_subprocess_with_logging")
@@ -249,7 +341,7 @@ class HeapdumpTests(TestCase):
         run_subprocess_with_logging.return_value = 0
         heapdump = telemetry.Heapdump("/var/log")
         t = telemetry.Telemetry(enabled_devices=[heapdump.command], devices=[heapdump])
-        node = cluster.Node(pid="1234", binary_path="/bin", host_name="localhost", node_name="rally0", telemetry=t)
+        node = rally_node("rally0", pid="1234")
         t.attach_to_node(node)
         t.detach_from_node(node, running=True)
         run_subprocess_with_logging.assert_called_with("jmap -dump:format=b,file=/var/log/heap_at_exit_1234.hprof 1234")
@@ -286,8 +378,7 @@ class CcrStatsTests(TestCase):
         telemetry_params = {
             "ccr-stats-sample-interval": -1 * random.random()
         }
-        with self.assertRaisesRegex(exceptions.SystemSetupError,
-                                    r"The telemetry parameter 'ccr-stats-sample-interval' must be greater than zero but was .*\."):
+        with self.assertRaisesRegex(exceptions.SystemSetupError, non_positive_sample_interval_error("ccr-stats-sample-interval")):
             telemetry.CcrStats(telemetry_params, clients, metrics_store)
 
     def test_wrong_cluster_name_in_ccr_stats_indices_forbidden(self):
@@ -300,17 +391,69 @@ class CcrStatsTests(TestCase):
                 "wrong_cluster_name": ["follower"]
             }
         }
-        with self.assertRaisesRegex(exceptions.SystemSetupError,
-                                    r"The telemetry parameter 'ccr-stats-indices' must be a JSON Object with keys matching "
-                                    r"the cluster names \[{}] specified in --target-hosts "
-                                    r"but it had \[wrong_cluster_name\].".format(",".join(sorted(clients.keys())))
-                                    ):
+        with self.assertRaisesRegex(exceptions.SystemSetupError, wrong_cluster_name_error("ccr-stats-indices", clients)):
             telemetry.CcrStats(telemetry_params, clients, metrics_store)
 
 
 class CcrStatsRecorderTests(TestCase):
     java_signed_maxlong = (2**63) - 1
 
+    # numeric fields of a follower shard in the CCR stats response
+    shard_stats_fields = (
+        "leader_global_checkpoint",
+        "leader_max_seq_no",
+        "follower_global_checkpoint",
+        "follower_max_seq_no",
+        "last_requested_seq_no",
+        "outstanding_read_requests",
+        "outstanding_write_requests",
+        "write_buffer_operation_count",
+        "follower_mapping_version",
+        "total_read_time_millis",
+        "total_read_remote_exec_time_millis",
+        "successful_read_requests",
+        "failed_read_requests",
+        "operations_read",
+        "bytes_read",
+        "total_write_time_millis",
+        "successful_write_requests",
+        "failed_write_requests",
+        "operations_written",
+        "time_since_last_read_millis",
+    )
+
+    @classmethod
+    def setUpClass(cls):
+        # draw all random values once per class, one row per shard. getrandbits() yields the same
+        # range as random.randint(0, java_signed_maxlong) but is much cheaper to call.
+        bits = cls.java_signed_maxlong.bit_length()
+        cls.shard_templates = [
+            {
+                "remote_cluster": "leader_cluster",
+                "read_exceptions": [],
+                **dict(zip(cls.shard_stats_fields, (random.getrandbits(bits) for _ in cls.shard_stats_fields)))
+            } for _ in range(2)
+        ]
+
+    @classmethod
+    def follower_shard(cls, template, shard_id, leader_index, follower_index):
+        # templates are reused round-robin so any number of shards is supported. A shallow copy suffices as the recorder
+        # never modifies shard stats.
+        shard = cls.shard_templates[template % len(cls.shard_templates)].copy()
+        shard["shard_id"] = shard_id
+        shard["leader_index"] = leader_index
+        shard["follower_index"] = follower_index
+        return shard
+
+    def assert_ccr_stats_stored(self, metrics_store_put_doc, expected_calls):
+        # calls are keyed by (index, shard id) so they can be matched in any order with hash lookups. In contrast to
+        # assert_has_calls(any_order=True) this also fails on unexpected additional calls.
+        def by_shard(calls):
+            return {(c.kwargs["meta_data"]["index"], c.args[0]["shard"]["shard_id"]): c for c in calls}
+
+        self.assertEqual(len(expected_calls), metrics_store_put_doc.call_count)
+        self.assertEqual(by_shard(expected_calls), by_shard(metrics_store_put_doc.call_args_list))
+
     def test_raises_exception_on_transport_error(self):
         client = Client(transport_client=TransportClient(response={}, force_error=True))
         cfg = create_config()
@@ -323,33 +466,9 @@ class CcrStatsRecorderTests(TestCase):
 
     @mock.patch("esrally.metrics.EsMetricsStore.put_doc")
     def test_stores_default_ccr_stats(self, metrics_store_put_doc):
-        java_signed_maxlong = CcrStatsRecorderTests.java_signed_maxlong
-
         shard_id = random.randint(0, 999)
-        remote_cluster = "leader_cluster"
         leader_index = "leader"
         follower_index = "follower"
-        leader_global_checkpoint = random.randint(0, java_signed_maxlong)
-        leader_max_seq_no = random.randint(0, java_signed_maxlong)
-        follower_global_checkpoint = random.randint(0, java_signed_maxlong)
-        follower_max_seq_no = random.randint(0, java_signed_maxlong)
-        last_requested_seq_no = random.randint(0, java_signed_maxlong)
-        outstanding_read_requests = random.randint(0, java_signed_maxlong)
-        outstanding_write_requests = random.randint(0, java_signed_maxlong)
-        write_buffer_operation_count = random.randint(0, java_signed_maxlong)
-        follower_mapping_version = random.randint(0, java_signed_maxlong)
-        total_read_time_millis = random.randint(0, java_signed_maxlong)
-        total_read_remote_exec_time_millis = random.randint(0, java_signed_maxlong)
-        successful_read_requests = random.randint(0, java_signed_maxlong)
-        failed_read_requests = random.randint(0, java_signed_maxlong)
-        operations_read = random.randint(0, java_signed_maxlong)
-        bytes_read = random.randint(0, java_signed_maxlong)
-        total_write_time_millis = random.randint(0, java_signed_maxlong)
-        successful_write_requests = random.randint(0, java_signed_maxlong)
-        failed_write_requests = random.randint(0, java_signed_maxlong)
-        operations_written = random.randint(0, java_signed_maxlong)
-        read_exceptions = []
-        time_since_last_read_millis = random.randint(0, java_signed_maxlong)
 
         ccr_stats_follower_response = {
             "auto_follow_stats": {
@@ -363,33 +482,7 @@ class CcrStatsRecorderTests(TestCase):
                     {
                         "index": follower_index,
                         "shards": [
-                            {
-                                "shard_id": shard_id,
-                                "remote_cluster": remote_cluster,
-                                "leader_index": leader_index,
-                                "follower_index": follower_index,
-                                "leader_global_checkpoint": leader_global_checkpoint,
-                                "leader_max_seq_no": leader_max_seq_no,
-                                "follower_global_checkpoint": follower_global_checkpoint,
-                                "follower_max_seq_no": follower_max_seq_no,
-                                "last_requested_seq_no": last_requested_seq_no,
-                                "outstanding_read_requests": outstanding_read_requests,
-                                "outstanding_write_requests": outstanding_write_requests,
-                                "write_buffer_operation_count": write_buffer_operation_count,
-                                "follower_mapping_version": follower_mapping_version,
-                                "total_read_time_millis": total_read_time_millis,
-                                "total_read_remote_exec_time_millis": total_read_remote_exec_time_millis,
-                                "successful_read_requests": successful_read_requests,
-                                "failed_read_requests": failed_read_requests,
-                                "operations_read": operations_read,
-                                "bytes_read": bytes_read,
-                                "total_write_time_millis": total_write_time_millis,
-                                "successful_write_requests": successful_write_requests,
-                                "failed_write_requests": failed_write_requests,
-                                "operations_written": operations_written,
-                                "read_exceptions": read_exceptions,
-                                "time_since_last_read_millis": time_since_last_read_millis,
-                            }
+                            CcrStatsRecorderTests.follower_shard(0, shard_id, leader_index, follower_index)
                         ]
                     }
                 ]
@@ -420,33 +513,9 @@ class CcrStatsRecorderTests(TestCase):
 
     @mock.patch("esrally.metrics.EsMetricsStore.put_doc")
     def test_stores_default_ccr_stats_many_shards(self, metrics_store_put_doc):
-        java_signed_maxlong = CcrStatsRecorderTests.java_signed_maxlong
-
-        remote_cluster = "leader_cluster"
         leader_index = "leader"
         follower_index = "follower"
         shard_range = range(2)
-        leader_global_checkpoint = [random.randint(0, java_signed_maxlong) for _ in shard_range]
-        leader_max_seq_no = [random.randint(0, java_signed_maxlong) for _ in shard_range]
-        follower_global_checkpoint = [random.randint(0, java_signed_maxlong) for _ in shard_range]
-        follower_max_seq_no = [random.randint(0, java_signed_maxlong) for _ in shard_range]
-        last_requested_seq_no = [random.randint(0, java_signed_maxlong) for _ in shard_range]
-        outstanding_read_requests = [random.randint(0, java_signed_maxlong) for _ in shard_range]
-        outstanding_write_requests = [random.randint(0, java_signed_maxlong) for _ in shard_range]
-        write_buffer_operation_count = [random.randint(0, java_signed_maxlong) for _ in shard_range]
-        follower_mapping_version = [random.randint(0, java_signed_maxlong) for _ in shard_range]
-        total_read_time_millis = [random.randint(0, java_signed_maxlong) for _ in shard_range]
-        total_read_remote_exec_time_millis = [random.randint(0, java_signed_maxlong) for _ in shard_range]
-        successful_read_requests = [random.randint(0, java_signed_maxlong) for _ in shard_range]
-        failed_read_requests = [random.randint(0, java_signed_maxlong) for _ in shard_range]
-        operations_read = [random.randint(0, java_signed_maxlong) for _ in shard_range]
-        bytes_read = [random.randint(0, java_signed_maxlong) for _ in shard_range]
-        total_write_time_millis = [random.randint(0, java_signed_maxlong) for _ in shard_range]
-        successful_write_requests = [random.randint(0, java_signed_maxlong) for _ in shard_range]
-        failed_write_requests = [random.randint(0, java_signed_maxlong) for _ in shard_range]
-        operations_written = [random.randint(0, java_signed_maxlong) for _ in shard_range]
-        read_exceptions = [[] for _ in shard_range]
-        time_since_last_read_millis = [random.randint(0, java_signed_maxlong) for _ in shard_range]
 
         ccr_stats_follower_response = {
             "auto_follow_stats": {
@@ -460,33 +529,8 @@ class CcrStatsRecorderTests(TestCase):
                     {
                         "index": follower_index,
                         "shards": [
-                            {
-                                "shard_id": shard_id,
-                                "remote_cluster": remote_cluster,
-                                "leader_index": leader_index,
-                                "follower_index": follower_index,
-                                "leader_global_checkpoint": leader_global_checkpoint[shard_id],
-                                "leader_max_seq_no": leader_max_seq_no[shard_id],
-                                "follower_global_checkpoint": follower_global_checkpoint[shard_id],
-                                "follower_max_seq_no": follower_max_seq_no[shard_id],
-                                "last_requested_seq_no": last_requested_seq_no[shard_id],
-                                "outstanding_read_requests": outstanding_read_requests[shard_id],
-                                "outstanding_write_requests": outstanding_write_requests[shard_id],
-                                "write_buffer_operation_count": write_buffer_operation_count[shard_id],
-                                "follower_mapping_version": follower_mapping_version[shard_id],
-                                "total_read_time_millis": total_read_time_millis[shard_id],
-                                "total_read_remote_exec_time_millis": total_read_remote_exec_time_millis[shard_id],
-                                "successful_read_requests": successful_read_requests[shard_id],
-                                "failed_read_requests": failed_read_requests[shard_id],
-                                "operations_read": operations_read[shard_id],
-                                "bytes_read": bytes_read[shard_id],
-                                "total_write_time_millis": total_write_time_millis[shard_id],
-                                "successful_write_requests": successful_write_requests[shard_id],
-                                "failed_write_requests": failed_write_requests[shard_id],
-                                "operations_written": operations_written[shard_id],
-                                "read_exceptions": read_exceptions[shard_id],
-                                "time_since_last_read_millis": time_since_last_read_millis[shard_id],
-                            } for shard_id in shard_range
+                            CcrStatsRecorderTests.follower_shard(shard_id, shard_id, leader_index, follower_index)
+                            for shard_id in shard_range
                         ]
                     }
                 ]
@@ -512,7 +556,7 @@ class CcrStatsRecorderTests(TestCase):
             }
         ]
 
-        metrics_store_put_doc.assert_has_calls([
+        self.assert_ccr_stats_stored(metrics_store_put_doc, [
             mock.call(
                 {
                     "name": "ccr-stats",
@@ -527,40 +571,14 @@ class CcrStatsRecorderTests(TestCase):
                 },
                 level=MetaInfoScope.cluster,
                 meta_data=shard_metadata[1])
-            ],
-            any_order=True
-        )
+        ])
 
     @mock.patch("esrally.metrics.EsMetricsStore.put_doc")
     def test_stores_filtered_ccr_stats(self, metrics_store_put_doc):
-        java_signed_maxlong = CcrStatsRecorderTests.java_signed_maxlong
-
-        remote_cluster = "leader_cluster"
         leader_index1 = "leader1"
         follower_index1 = "follower1"
         leader_index2 = "leader2"
         follower_index2 = "follower2"
-        leader_global_checkpoint = random.randint(0, java_signed_maxlong)
-        leader_max_seq_no = random.randint(0, java_signed_maxlong)
-        follower_global_checkpoint = random.randint(0, java_signed_maxlong)
-        follower_max_seq_no = random.randint(0, java_signed_maxlong)
-        last_requested_seq_no = random.randint(0, java_signed_maxlong)
-        outstanding_read_requests = random.randint(0, java_signed_maxlong)
-        outstanding_write_requests = random.randint(0, java_signed_maxlong)
-        write_buffer_operation_count = random.randint(0, java_signed_maxlong)
-        follower_mapping_version = random.randint(0, java_signed_maxlong)
-        total_read_time_millis = random.randint(0, java_signed_maxlong)
-        total_read_remote_exec_time_millis = random.randint(0, java_signed_maxlong)
-        successful_read_requests = random.randint(0, java_signed_maxlong)
-        failed_read_requests = random.randint(0, java_signed_maxlong)
-        operations_read = random.randint(0, java_signed_maxlong)
-        bytes_read = random.randint(0, java_signed_maxlong)
-        total_write_time_millis = random.randint(0, java_signed_maxlong)
-        successful_write_requests = random.randint(0, java_signed_maxlong)
-        failed_write_requests = random.randint(0, java_signed_maxlong)
-        operations_written = random.randint(0, java_signed_maxlong)
-        read_exceptions = []
-        time_since_last_read_millis = random.randint(0, java_signed_maxlong)
 
         ccr_stats_follower_response = {
             "auto_follow_stats": {
@@ -574,66 +592,13 @@ class CcrStatsRecorderTests(TestCase):
                     {
                         "index": follower_index1,
                         "shards": [
-                            {
-                                "shard_id": 0,
-                                "remote_cluster": remote_cluster,
-                                "leader_index": leader_index1,
-                                "follower_index": follower_index1,
-                                "leader_global_checkpoint": leader_global_checkpoint,
-                                "leader_max_seq_no": leader_max_seq_no,
-                                "follower_global_checkpoint": follower_global_checkpoint,
-                                "follower_max_seq_no": follower_max_seq_no,
-                                "last_requested_seq_no": last_requested_seq_no,
-                                "outstanding_read_requests": outstanding_read_requests,
-                                "outstanding_write_requests": outstanding_write_requests,
-                                "write_buffer_operation_count": write_buffer_operation_count,
-                                "follower_mapping_version": follower_mapping_version,
-                                "total_read_time_millis": total_read_time_millis,
-                                "total_read_remote_exec_time_millis": total_read_remote_exec_time_millis,
-                                "successful_read_requests": successful_read_requests,
-                                "failed_read_requests": failed_read_requests,
-                                "operations_read": operations_read,
-                                "bytes_read": bytes_read,
-                                "total_write_time_millis": total_write_time_millis,
-                                "successful_write_requests": successful_write_requests,
-                                "failed_write_requests": failed_write_requests,
-                                "operations_written": operations_written,
-                                "read_exceptions": read_exceptions,
-                                "time_since_last_read_millis": time_since_last_read_millis,
-                            }
+                            CcrStatsRecorderTests.follower_shard(0, 0, leader_index1, follower_index1)
                         ]
                     },
                     {
                         "index": follower_index2,
                         "shards": [
-                            {
-                                "shard_id": 0,
-                                "remote_cluster": remote_cluster,
-                                "leader_index": leader_index2,
-                                "follower_index": follower_index2,
-                                "leader_global_checkpoint": leader_global_checkpoint,
-                                "leader_max_seq_no": leader_max_seq_no,
-                                "follower_global_checkpoint": follower_global_checkpoint,
-                                "follower_max_seq_no": follower_max_seq_no,
-                                "last_requested_seq_no": last_requested_seq_no,
-                                "outstanding_read_requests": outstanding_read_requests,
-                                "outstanding_write_requests": outstanding_write_requests,
-                                "write_buffer_operation_count": write_buffer_operation_count,
-                                "follower_mapping_version": follower_mapping_version,
-                                "total_read_time_millis": total_read_time_millis,
-                                "total_read_remote_exec_time_millis": total_read_remote_exec_time_millis,
-                                "successful_read_requests": successful_read_requests,
-                                "failed_read_requests": failed_read_requests,
-                                "operations_read": operations_read,
-                                "bytes_read": bytes_read,
-                                "total_write_time_millis": total_write_time_millis,
-                                "successful_write_requests": successful_write_requests,
-                                "failed_write_requests": failed_write_requests,
-                                "operations_written": operations_written,
-                                "read_exceptions": read_exceptions,
-                                "time_since_last_read_millis": time_since_last_read_millis,
-                            }
-
+                            CcrStatsRecorderTests.follower_shard(1, 0, leader_index2, follower_index2)
                         ]
                     }
                 ]
@@ -652,7 +617,7 @@ class CcrStatsRecorderTests(TestCase):
             "index": follower_index1
         }
 
-        metrics_store_put_doc.assert_has_calls([
+        self.assert_ccr_stats_stored(metrics_store_put_doc, [
             mock.call(
                 {
                     "name": "ccr-stats",
@@ -660,9 +625,7 @@ class CcrStatsRecorderTests(TestCase):
                 },
                 level=MetaInfoScope.cluster,
                 meta_data=shard_metadata)
-            ],
-            any_order=True
-        )
+        ])
 
 
 class RecoveryStatsTests(TestCase):
@@ -917,200 +880,40 @@ class NodeStatsTests(TestCase):
         mocked_console_warn.assert_not_called()
 
 
-class NodeStatsRecorderTests(TestCase):
-    node_stats_response = {
-        "cluster_name": "elasticsearch",
-        "nodes": {
-            "Zbl_e8EyRXmiR47gbHgPfg": {
-                "timestamp": 1524379617017,
-                "name": "rally0",
-                "transport_address": "127.0.0.1:9300",
-                "host": "127.0.0.1",
-                "ip": "127.0.0.1:9300",
-                "roles": [
-                    "master",
-                    "data",
-                    "ingest"
-                ],
-                "indices": {
-                    "docs": {
-                        "count": 0,
-                        "deleted": 0
-                    },
-                    "store": {
-                        "size_in_bytes": 0
-                    },
-                    "indexing": {
-                        "is_throttled": False,
-                        "throttle_time_in_millis": 0
-                    },
-                    "search": {
-                        "open_contexts": 0,
-                        "query_total": 0,
-                        "query_time_in_millis": 0
-                    },
-                    "merges": {
-                        "current": 0,
-                        "current_docs": 0,
-                        "current_size_in_bytes": 0
-                    },
-                    "refresh": {
-                        "total": 747,
-                        "total_time_in_millis": 277382,
-                        "listeners": 0
-                    },
-                    "query_cache": {
-                        "memory_size_in_bytes": 0,
-                        "total_count": 0,
-                        "hit_count": 0,
-                        "miss_count": 0,
-                        "cache_size": 0,
-                        "cache_count": 0,
-                        "evictions": 0
-                    },
-                    "completion": {
-                        "size_in_bytes": 0
-                    },
-                    "segments": {
-                        "count": 0,
-                        "memory_in_bytes": 0,
-                        "max_unsafe_auto_id_timestamp": -9223372036854775808,
-                        "file_sizes": {}
-                    },
-                    "translog": {
-                        "operations": 0,
-                        "size_in_bytes": 0,
-                        "uncommitted_operations": 0,
-                        "uncommitted_size_in_bytes": 0
-                    },
-                    "request_cache": {
-                        "memory_size_in_bytes": 0,
-                        "evictions": 0,
-                        "hit_count": 0,
-                        "miss_count": 0
-                    },
-                    "recovery": {
-                        "current_as_source": 0,
-                        "current_as_target": 0,
-                        "throttle_time_in_millis": 0
-                    }
-                },
-                "jvm": {
-                    "buffer_pools": {
-                        "mapped": {
-                            "count": 7,
-                            "used_in_bytes": 3120,
-                            "total_capacity_in_bytes": 9999
-                        },
-                        "direct": {
-                            "count": 6,
-                            "used_in_bytes": 73868,
-                            "total_capacity_in_bytes": 73867
-                        }
-                    },
-                    "classes": {
-                        "current_loaded_count": 9992,
-                        "total_loaded_count": 9992,
-                        "total_unloaded_count": 0
-                    },
-                    "mem": {
-                        "heap_used_in_bytes": 119073552,
-                        "heap_used_percent": 19,
-                        "heap_committed_in_bytes": 626393088,
-                        "heap_max_in_bytes": 626393088,
-                        "non_heap_used_in_bytes": 110250424,
-                        "non_heap_committed_in_bytes": 118108160,
-                        "pools": {
-                            "young": {
-                                "used_in_bytes": 66378576,
-                                "max_in_bytes": 139591680,
-                                "peak_used_in_bytes": 139591680,
-                                "peak_max_in_bytes": 139591680
-                            },
-                            "survivor": {
-                                "used_in_bytes": 358496,
-                                "max_in_bytes": 17432576,
-                                "peak_used_in_bytes": 17432576,
-                                "peak_max_in_bytes": 17432576
-                            },
-                            "old": {
-                                "used_in_bytes": 52336480,
-                                "max_in_bytes": 469368832,
-                                "peak_used_in_bytes": 52336480,
-                                "peak_max_in_bytes": 469368832
-                            }
-                        }
-                    },
-                    "gc": {
-                        "collectors": {
-                            "young": {
-                                "collection_count": 3,
-                                "collection_time_in_millis": 309
-                            },
-                            "old": {
-                                "collection_count": 2,
-                                "collection_time_in_millis": 229
-                            }
-                        }
-                    }
-                },
-                "process": {
-                    "timestamp": 1526045135857,
-                    "open_file_descriptors": 312,
-                    "max_file_descriptors": 1048576,
-                    "cpu": {
-                        "percent": 10,
-                        "total_in_millis": 56520
-                    },
-                    "mem": {
-                        "total_virtual_in_bytes": 2472173568
-                    }
-                },
-                "thread_pool": {
-                    "generic": {
-                        "threads": 4,
-                        "queue": 0,
-                        "active": 0,
-                        "rejected": 0,
-                        "largest": 4,
-                        "completed": 8
-                    }
-                },
-                "breakers": {
-                    "parent": {
-                        "limit_size_in_bytes": 726571417,
-                        "limit_size": "692.9mb",
-                        "estimated_size_in_bytes": 0,
-                        "estimated_size": "0b",
-                        "overhead": 1.0,
-                        "tripped": 0
-                    }
+# loaded once as the recorder only reads from it
+NODE_STATS_FULL_RESPONSE = load_json_resource("node_stats.json")
+
+
+def without_keys(d, *keys):
+    return {k: v for k, v in d.items() if k not in keys}
+
+
+FULL_NODE_STATS = NODE_STATS_FULL_RESPONSE["nodes"]["Zbl_e8EyRXmiR47gbHgPfg"]
+
+# a smaller variant of the full node stats response without fielddata and transport stats and with empty indices.
+# Shared by all tests but only the top level is frozen. Nested sections stay plain dicts because NodeStatsRecorder checks for them
+# explicitly, so they must not be modified either.
+NODE_STATS_RESPONSE = types.MappingProxyType({
+    **NODE_STATS_FULL_RESPONSE,
+    "nodes": {
+        "Zbl_e8EyRXmiR47gbHgPfg": {
+            **without_keys(FULL_NODE_STATS, "transport"),
+            "indices": {
+                **without_keys(FULL_NODE_STATS["indices"], "fielddata"),
+                "docs": {
+                    "count": 0,
+                    "deleted": 0
                 },
-                "indexing_pressure": {
-                    "memory": {
-                        "current": {
-                            "combined_coordinating_and_primary_in_bytes": 0,
-                            "coordinating_in_bytes": 0,
-                            "primary_in_bytes": 0,
-                            "replica_in_bytes": 0,
-                            "all_in_bytes": 0
-                        },
-                        "total": {
-                            "combined_coordinating_and_primary_in_bytes": 0,
-                            "coordinating_in_bytes": 0,
-                            "primary_in_bytes": 0,
-                            "replica_in_bytes": 0,
-                            "all_in_bytes": 0,
-                            "coordinating_rejections": 0,
-                            "primary_rejections": 0,
-                            "replica_rejections": 0
-                        }
-                    }
+                "store": {
+                    "size_in_bytes": 0
                 }
             }
         }
     }
+})
+
 
+class NodeStatsRecorderTests(TestCase):
     indices_stats_response_flattened = collections.OrderedDict({
         "indices_docs_count": 0,
         "indices_docs_deleted": 0,
@@ -1205,661 +1008,187 @@ class NodeStatsRecorderTests(TestCase):
         "indexing_pressure_memory_total_replica_rejections": 0
     })
 
+    # flattened node level stats of the full node stats response which are independent of the included indices metrics
+    node_stats_flattened = (
+        ("thread_pool_generic_active", 0),
+        ("thread_pool_generic_completed", 8),
+        ("thread_pool_generic_largest", 4),
+        ("thread_pool_generic_queue", 0),
+        ("thread_pool_generic_rejected", 0),
+        ("thread_pool_generic_threads", 4),
+        ("breakers_parent_estimated_size_in_bytes", 0),
+        ("breakers_parent_limit_size_in_bytes", 726571417),
+        ("breakers_parent_overhead", 1.0),
+        ("breakers_parent_tripped", 0),
+        ("jvm_buffer_pools_direct_count", 6),
+        ("jvm_buffer_pools_direct_total_capacity_in_bytes", 73867),
+        ("jvm_buffer_pools_direct_used_in_bytes", 73868),
+        ("jvm_buffer_pools_mapped_count", 7),
+        ("jvm_buffer_pools_mapped_total_capacity_in_bytes", 9999),
+        ("jvm_buffer_pools_mapped_used_in_bytes", 3120),
+        ("jvm_mem_heap_committed_in_bytes", 626393088),
+        ("jvm_mem_heap_max_in_bytes", 626393088),
+        ("jvm_mem_heap_used_in_bytes", 119073552),
+        ("jvm_mem_heap_used_percent", 19),
+        ("jvm_mem_non_heap_committed_in_bytes", 118108160),
+        ("jvm_mem_non_heap_used_in_bytes", 110250424),
+        ("jvm_mem_pools_old_max_in_bytes", 469368832),
+        ("jvm_mem_pools_old_peak_max_in_bytes", 469368832),
+        ("jvm_mem_pools_old_peak_used_in_bytes", 52336480),
+        ("jvm_mem_pools_old_used_in_bytes", 52336480),
+        ("jvm_mem_pools_survivor_max_in_bytes", 17432576),
+        ("jvm_mem_pools_survivor_peak_max_in_bytes", 17432576),
+        ("jvm_mem_pools_survivor_peak_used_in_bytes", 17432576),
+        ("jvm_mem_pools_survivor_used_in_bytes", 358496),
+        ("jvm_mem_pools_young_max_in_bytes", 139591680),
+        ("jvm_mem_pools_young_peak_max_in_bytes", 139591680),
+        ("jvm_mem_pools_young_peak_used_in_bytes", 139591680),
+        ("jvm_mem_pools_young_used_in_bytes", 66378576),
+        ("jvm_gc_collectors_young_collection_count", 3),
+        ("jvm_gc_collectors_young_collection_time_in_millis", 309),
+        ("jvm_gc_collectors_old_collection_count", 2),
+        ("jvm_gc_collectors_old_collection_time_in_millis", 229),
+        ("transport_rx_count", 77),
+        ("transport_rx_size_in_bytes", 98723498),
+        ("transport_server_open", 12),
+        ("transport_tx_count", 88),
+        ("transport_tx_size_in_bytes", 23879803),
+        ("process_cpu_percent", 10),
+        ("process_cpu_total_in_millis", 56520),
+        ("indexing_pressure_memory_current_combined_coordinating_and_primary_in_bytes", 0),
+        ("indexing_pressure_memory_current_coordinating_in_bytes", 0),
+        ("indexing_pressure_memory_current_primary_in_bytes", 0),
+        ("indexing_pressure_memory_current_replica_in_bytes", 0),
+        ("indexing_pressure_memory_current_all_in_bytes", 0),
+        ("indexing_pressure_memory_total_combined_coordinating_and_primary_in_bytes", 0),
+        ("indexing_pressure_memory_total_coordinating_in_bytes", 0),
+        ("indexing_pressure_memory_total_primary_in_bytes", 0),
+        ("indexing_pressure_memory_total_replica_in_bytes", 0),
+        ("indexing_pressure_memory_total_all_in_bytes", 0),
+        ("indexing_pressure_memory_total_coordinating_rejections", 0),
+        ("indexing_pressure_memory_total_primary_rejections", 0),
+        ("indexing_pressure_memory_total_replica_rejections", 0),
+    )
+
+    all_indices_stats_flattened = (
+        ("indices_docs_count", 76892364),
+        ("indices_docs_deleted", 324530),
+        ("indices_fielddata_evictions", 17),
+        ("indices_fielddata_memory_size_in_bytes", 6936),
+        ("indices_indexing_throttle_time_in_millis", 0),
+        ("indices_merges_current", 0),
+        ("indices_merges_current_docs", 0),
+        ("indices_merges_current_size_in_bytes", 0),
+        ("indices_query_cache_cache_count", 0),
+        ("indices_query_cache_cache_size", 0),
+        ("indices_query_cache_evictions", 0),
+        ("indices_query_cache_hit_count", 0),
+        ("indices_query_cache_memory_size_in_bytes", 0),
+        ("indices_query_cache_miss_count", 0),
+        ("indices_query_cache_total_count", 0),
+        ("indices_request_cache_evictions", 0),
+        ("indices_request_cache_hit_count", 0),
+        ("indices_request_cache_memory_size_in_bytes", 0),
+        ("indices_request_cache_miss_count", 0),
+        ("indices_search_open_contexts", 0),
+        ("indices_search_query_time_in_millis", 0),
+        ("indices_search_query_total", 0),
+        ("indices_segments_count", 0),
+        ("indices_segments_max_unsafe_auto_id_timestamp", -9223372036854775808),
+        ("indices_segments_memory_in_bytes", 0),
+        ("indices_store_size_in_bytes", 983409834),
+        ("indices_translog_operations", 0),
+        ("indices_translog_size_in_bytes", 0),
+        ("indices_translog_uncommitted_operations", 0),
+        ("indices_translog_uncommitted_size_in_bytes", 0),
+    )
+
+    selected_indices_stats_flattened = (
+        ("indices_docs_count", 76892364),
+        ("indices_docs_deleted", 324530),
+        ("indices_refresh_total", 747),
+        ("indices_refresh_total_time_in_millis", 277382),
+        ("indices_refresh_listeners", 0),
+    )
+
+    # node stats are always recorded for the node "rally0" of the cluster "remote"
+    node_stats_call = functools.partial(mock.call,
+                                        level=MetaInfoScope.node,
+                                        node_name="rally0",
+                                        meta_data={"cluster": "remote", "node_name": "rally0"})
+
+    def setUp(self):
+        # the recorder only hands documents to the metrics store so there is no need for a real one
+        self.metrics_store = mock.Mock(spec=metrics.EsMetricsStore)
+
     def test_negative_sample_interval_forbidden(self):
         client = Client()
-        cfg = create_config()
-        metrics_store = metrics.EsMetricsStore(cfg)
         telemetry_params = {
             "node-stats-sample-interval": -1 * random.random()
         }
-        with self.assertRaisesRegex(exceptions.SystemSetupError,
-                                    r"The telemetry parameter 'node-stats-sample-interval' must be greater than zero but was .*\."):
-            telemetry.NodeStatsRecorder(telemetry_params, cluster_name="default", client=client, metrics_store=metrics_store)
+        with self.assertRaisesRegex(exceptions.SystemSetupError, non_positive_sample_interval_error("node-stats-sample-interval")):
+            telemetry.NodeStatsRecorder(telemetry_params, cluster_name="default", client=client, metrics_store=self.metrics_store)
 
     def test_flatten_indices_fields(self):
-        client = Client(nodes=SubClient(stats=NodeStatsRecorderTests.node_stats_response))
-        cfg = create_config()
-        metrics_store = metrics.EsMetricsStore(cfg)
+        client = Client(nodes=SubClient(stats=NODE_STATS_RESPONSE))
         telemetry_params = {}
-        recorder = telemetry.NodeStatsRecorder(telemetry_params, cluster_name="remote", client=client, metrics_store=metrics_store)
+        recorder = telemetry.NodeStatsRecorder(telemetry_params, cluster_name="remote", client=client, metrics_store=self.metrics_store)
         flattened_fields = recorder.flatten_stats_fields(
             prefix="indices",
-            stats=NodeStatsRecorderTests.node_stats_response["nodes"]["Zbl_e8EyRXmiR47gbHgPfg"]["indices"]
+            stats=NODE_STATS_RESPONSE["nodes"]["Zbl_e8EyRXmiR47gbHgPfg"]["indices"]
         )
         self.assertDictEqual(NodeStatsRecorderTests.indices_stats_response_flattened, flattened_fields)
 
-    @mock.patch("esrally.metrics.EsMetricsStore.put_doc")
-    def test_stores_default_nodes_stats(self, metrics_store_put_doc):
-        client = Client(nodes=SubClient(stats=NodeStatsRecorderTests.node_stats_response))
-        cfg = create_config()
-        metrics_store = metrics.EsMetricsStore(cfg)
-        node_name = [NodeStatsRecorderTests.node_stats_response["nodes"][node]["name"]
-                     for node in NodeStatsRecorderTests.node_stats_response["nodes"]][0]
-        metrics_store_meta_data = {"cluster": "remote", "node_name": node_name}
-
+    def test_flattened_field_names_are_shared_across_samples(self):
+        client = Client(nodes=SubClient(stats=NODE_STATS_RESPONSE))
+        recorder = telemetry.NodeStatsRecorder({}, cluster_name="remote", client=client, metrics_store=self.metrics_store)
+        stats = NODE_STATS_RESPONSE["nodes"]["Zbl_e8EyRXmiR47gbHgPfg"]["indices"]
+        first_sample = list(recorder.flatten_stats_fields(prefix="indices", stats=stats))
+        second_sample = list(recorder.flatten_stats_fields(prefix="indices", stats=stats))
+        for first, second in zip(first_sample, second_sample):
+            self.assertIs(first, second)
+
+    def test_stores_default_nodes_stats(self):
+        client = Client(nodes=SubClient(stats=NODE_STATS_RESPONSE))
         telemetry_params = {}
-        recorder = telemetry.NodeStatsRecorder(telemetry_params, cluster_name="remote", client=client, metrics_store=metrics_store)
+        recorder = telemetry.NodeStatsRecorder(telemetry_params, cluster_name="remote", client=client, metrics_store=self.metrics_store)
         recorder.record()
 
         expected_doc = collections.OrderedDict()
         expected_doc["name"] = "node-stats"
         expected_doc.update(NodeStatsRecorderTests.default_stats_response_flattened)
 
-        metrics_store_put_doc.assert_called_once_with(expected_doc,
-                                                      level=MetaInfoScope.node,
-                                                      node_name="rally0",
-                                                      meta_data=metrics_store_meta_data)
-
-    @mock.patch("esrally.metrics.EsMetricsStore.put_doc")
-    def test_stores_all_nodes_stats(self, metrics_store_put_doc):
-        node_stats_response = {
-            "cluster_name": "elasticsearch",
-            "nodes": {
-                "Zbl_e8EyRXmiR47gbHgPfg": {
-                    "timestamp": 1524379617017,
-                    "name": "rally0",
-                    "transport_address": "127.0.0.1:9300",
-                    "host": "127.0.0.1",
-                    "ip": "127.0.0.1:9300",
-                    "roles": [
-                        "master",
-                        "data",
-                        "ingest"
-                    ],
-                    "indices": {
-                        "docs": {
-                            "count": 76892364,
-                            "deleted": 324530
-                        },
-                        "store": {
-                            "size_in_bytes": 983409834
-                        },
-                        "indexing": {
-                            "is_throttled": False,
-                            "throttle_time_in_millis": 0
-                        },
-                        "search": {
-                            "open_contexts": 0,
-                            "query_total": 0,
-                            "query_time_in_millis": 0
-                        },
-                        "merges": {
-                            "current": 0,
-                            "current_docs": 0,
-                            "current_size_in_bytes": 0
-                        },
-                        "refresh": {
-                            "total": 747,
-                            "total_time_in_millis": 277382,
-                            "listeners": 0
-                        },
-                        "query_cache": {
-                            "memory_size_in_bytes": 0,
-                            "total_count": 0,
-                            "hit_count": 0,
-                            "miss_count": 0,
-                            "cache_size": 0,
-                            "cache_count": 0,
-                            "evictions": 0
-                        },
-                        "fielddata": {
-                            "memory_size_in_bytes": 6936,
-                            "evictions": 17
-                        },
-                        "completion": {
-                            "size_in_bytes": 0
-                        },
-                        "segments": {
-                            "count": 0,
-                            "memory_in_bytes": 0,
-                            "max_unsafe_auto_id_timestamp": -9223372036854775808,
-                            "file_sizes": {}
-                        },
-                        "translog": {
-                            "operations": 0,
-                            "size_in_bytes": 0,
-                            "uncommitted_operations": 0,
-                            "uncommitted_size_in_bytes": 0
-                        },
-                        "request_cache": {
-                            "memory_size_in_bytes": 0,
-                            "evictions": 0,
-                            "hit_count": 0,
-                            "miss_count": 0
-                        },
-                        "recovery": {
-                            "current_as_source": 0,
-                            "current_as_target": 0,
-                            "throttle_time_in_millis": 0
-                        }
-                    },
-                    "jvm": {
-                        "buffer_pools": {
-                            "mapped": {
-                                "count": 7,
-                                "used_in_bytes": 3120,
-                                "total_capacity_in_bytes": 9999
-                            },
-                            "direct": {
-                                "count": 6,
-                                "used_in_bytes": 73868,
-                                "total_capacity_in_bytes": 73867
-                            }
-                        },
-                        "classes": {
-                            "current_loaded_count": 9992,
-                            "total_loaded_count": 9992,
-                            "total_unloaded_count": 0
-                        },
-                        "mem": {
-                            "heap_used_in_bytes": 119073552,
-                            "heap_used_percent": 19,
-                            "heap_committed_in_bytes": 626393088,
-                            "heap_max_in_bytes": 626393088,
-                            "non_heap_used_in_bytes": 110250424,
-                            "non_heap_committed_in_bytes": 118108160,
-                            "pools": {
-                                "young": {
-                                    "used_in_bytes": 66378576,
-                                    "max_in_bytes": 139591680,
-                                    "peak_used_in_bytes": 139591680,
-                                    "peak_max_in_bytes": 139591680
-                                },
-                                "survivor": {
-                                    "used_in_bytes": 358496,
-                                    "max_in_bytes": 17432576,
-                                    "peak_used_in_bytes": 17432576,
-                                    "peak_max_in_bytes": 17432576
-                                },
-                                "old": {
-                                    "used_in_bytes": 52336480,
-                                    "max_in_bytes": 469368832,
-                                    "peak_used_in_bytes": 52336480,
-                                    "peak_max_in_bytes": 469368832
-                                }
-                            }
-                        },
-                        "gc": {
-                            "collectors": {
-                                "young": {
-                                    "collection_count": 3,
-                                    "collection_time_in_millis": 309
-                                },
-                                "old": {
-                                    "collection_count": 2,
-                                    "collection_time_in_millis": 229
-                                }
-                            }
-                        }
-                    },
-                    "process": {
-                        "timestamp": 1526045135857,
-                        "open_file_descriptors": 312,
-                        "max_file_descriptors": 1048576,
-                        "cpu": {
-                            "percent": 10,
-                            "total_in_millis": 56520
-                        },
-                        "mem": {
-                            "total_virtual_in_bytes": 2472173568
-                        }
-                    },
-                    "thread_pool": {
-                        "generic": {
-                            "threads": 4,
-                            "queue": 0,
-                            "active": 0,
-                            "rejected": 0,
-                            "largest": 4,
-                            "completed": 8
-                        }
-                    },
-                    "transport": {
-                        "server_open": 12,
-                        "rx_count": 77,
-                        "rx_size_in_bytes": 98723498,
-                        "tx_count": 88,
-                        "tx_size_in_bytes": 23879803
-                    },
-                    "breakers": {
-                        "parent": {
-                            "limit_size_in_bytes": 726571417,
-                            "limit_size": "692.9mb",
-                            "estimated_size_in_bytes": 0,
-                            "estimated_size": "0b",
-                            "overhead": 1.0,
-                            "tripped": 0
-                        }
-                    },
-                    "indexing_pressure": {
-                        "memory": {
-                            "current": {
-                                "combined_coordinating_and_primary_in_bytes": 0,
-                                "coordinating_in_bytes": 0,
-                                "primary_in_bytes": 0,
-                                "replica_in_bytes": 0,
-                                "all_in_bytes": 0
-                            },
-                            "total": {
-                                "combined_coordinating_and_primary_in_bytes": 0,
-                                "coordinating_in_bytes": 0,
-                                "primary_in_bytes": 0,
-                                "replica_in_bytes": 0,
-                                "all_in_bytes": 0,
-                                "coordinating_rejections": 0,
-                                "primary_rejections": 0,
-                                "replica_rejections": 0
-                            }
-                        }
-                    }
-                }
-            }
-        }
-
-        client = Client(nodes=SubClient(stats=node_stats_response))
-        cfg = create_config()
-        metrics_store = metrics.EsMetricsStore(cfg)
-        node_name = [node_stats_response["nodes"][node]["name"] for node in node_stats_response["nodes"]][0]
-        metrics_store_meta_data = {"cluster": "remote", "node_name": node_name}
-        telemetry_params = {
-            "node-stats-include-indices": True
-        }
-        recorder = telemetry.NodeStatsRecorder(telemetry_params, cluster_name="remote", client=client, metrics_store=metrics_store)
-        recorder.record()
-
-        metrics_store_put_doc.assert_called_once_with(
-            {"name": "node-stats",
-             "indices_docs_count": 76892364,
-             "indices_docs_deleted": 324530,
-             "indices_fielddata_evictions": 17,
-             "indices_fielddata_memory_size_in_bytes": 6936,
-             "indices_indexing_throttle_time_in_millis": 0,
-             "indices_merges_current": 0,
-             "indices_merges_current_docs": 0,
-             "indices_merges_current_size_in_bytes": 0,
-             "indices_query_cache_cache_count": 0,
-             "indices_query_cache_cache_size": 0,
-             "indices_query_cache_evictions": 0,
-             "indices_query_cache_hit_count": 0,
-             "indices_query_cache_memory_size_in_bytes": 0,
-             "indices_query_cache_miss_count": 0,
-             "indices_query_cache_total_count": 0,
-             "indices_request_cache_evictions": 0,
-             "indices_request_cache_hit_count": 0,
-             "indices_request_cache_memory_size_in_bytes": 0,
-             "indices_request_cache_miss_count": 0,
-             "indices_search_open_contexts": 0,
-             "indices_search_query_time_in_millis": 0,
-             "indices_search_query_total": 0,
-             "indices_segments_count": 0,
-             "indices_segments_max_unsafe_auto_id_timestamp": -9223372036854775808,
-             "indices_segments_memory_in_bytes": 0,
-             "indices_store_size_in_bytes": 983409834,
-             "indices_translog_operations": 0,
-             "indices_translog_size_in_bytes": 0,
-             "indices_translog_uncommitted_operations": 0,
-             "indices_translog_uncommitted_size_in_bytes": 0,
-             "thread_pool_generic_active": 0,
-             "thread_pool_generic_completed": 8,
-             "thread_pool_generic_largest": 4,
-             "thread_pool_generic_queue": 0,
-             "thread_pool_generic_rejected": 0,
-             "thread_pool_generic_threads": 4,
-             "breakers_parent_estimated_size_in_bytes": 0,
-             "breakers_parent_limit_size_in_bytes": 726571417,
-             "breakers_parent_overhead": 1.0,
-             "breakers_parent_tripped": 0,
-             "jvm_buffer_pools_direct_count": 6,
-             "jvm_buffer_pools_direct_total_capacity_in_bytes": 73867,
-             "jvm_buffer_pools_direct_used_in_bytes": 73868,
-             "jvm_buffer_pools_mapped_count": 7,
-             "jvm_buffer_pools_mapped_total_capacity_in_bytes": 9999,
-             "jvm_buffer_pools_mapped_used_in_bytes": 3120,
-             "jvm_mem_heap_committed_in_bytes": 626393088,
-             "jvm_mem_heap_max_in_bytes": 626393088,
-             "jvm_mem_heap_used_in_bytes": 119073552,
-             "jvm_mem_heap_used_percent": 19,
-             "jvm_mem_non_heap_committed_in_bytes": 118108160,
-             "jvm_mem_non_heap_used_in_bytes": 110250424,
-             "jvm_mem_pools_old_max_in_bytes": 469368832,
-             "jvm_mem_pools_old_peak_max_in_bytes": 469368832,
-             "jvm_mem_pools_old_peak_used_in_bytes": 52336480,
-             "jvm_mem_pools_old_used_in_bytes": 52336480,
-             "jvm_mem_pools_survivor_max_in_bytes": 17432576,
-             "jvm_mem_pools_survivor_peak_max_in_bytes": 17432576,
-             "jvm_mem_pools_survivor_peak_used_in_bytes": 17432576,
-             "jvm_mem_pools_survivor_used_in_bytes": 358496,
-             "jvm_mem_pools_young_max_in_bytes": 139591680,
-             "jvm_mem_pools_young_peak_max_in_bytes": 139591680,
-             "jvm_mem_pools_young_peak_used_in_bytes": 139591680,
-             "jvm_mem_pools_young_used_in_bytes": 66378576,
-             "jvm_gc_collectors_young_collection_count": 3,
-             "jvm_gc_collectors_young_collection_time_in_millis": 309,
-             "jvm_gc_collectors_old_collection_count": 2,
-             "jvm_gc_collectors_old_collection_time_in_millis": 229,
-             "transport_rx_count": 77,
-             "transport_rx_size_in_bytes": 98723498,
-             "transport_server_open": 12,
-             "transport_tx_count": 88,
-             "transport_tx_size_in_bytes": 23879803,
-             "process_cpu_percent": 10,
-             "process_cpu_total_in_millis": 56520,
-             "indexing_pressure_memory_current_combined_coordinating_and_primary_in_bytes": 0,
-             "indexing_pressure_memory_current_coordinating_in_bytes": 0,
-             "indexing_pressure_memory_current_primary_in_bytes": 0,
-             "indexing_pressure_memory_current_replica_in_bytes": 0,
-             "indexing_pressure_memory_current_all_in_bytes": 0,
-             "indexing_pressure_memory_total_combined_coordinating_and_primary_in_bytes": 0,
-             "indexing_pressure_memory_total_coordinating_in_bytes": 0,
-             "indexing_pressure_memory_total_primary_in_bytes": 0,
-             "indexing_pressure_memory_total_replica_in_bytes": 0,
-             "indexing_pressure_memory_total_all_in_bytes": 0,
-             "indexing_pressure_memory_total_coordinating_rejections": 0,
-             "indexing_pressure_memory_total_primary_rejections": 0,
-             "indexing_pressure_memory_total_replica_rejections": 0},
-            level=MetaInfoScope.node,
-            node_name="rally0",
-            meta_data=metrics_store_meta_data)
+        self.assertEqual([self.node_stats_call(expected_doc)], self.metrics_store.put_doc.call_args_list)
 
-    @mock.patch("esrally.metrics.EsMetricsStore.put_doc")
-    def test_stores_selected_indices_metrics_from_nodes_stats(self, metrics_store_put_doc):
-        node_stats_response = {
-            "cluster_name": "elasticsearch",
-            "nodes": {
-                "Zbl_e8EyRXmiR47gbHgPfg": {
-                    "timestamp": 1524379617017,
-                    "name": "rally0",
-                    "transport_address": "127.0.0.1:9300",
-                    "host": "127.0.0.1",
-                    "ip": "127.0.0.1:9300",
-                    "roles": [
-                        "master",
-                        "data",
-                        "ingest"
-                    ],
-                    "indices": {
-                        "docs": {
-                            "count": 76892364,
-                            "deleted": 324530
-                        },
-                        "store": {
-                            "size_in_bytes": 983409834
-                        },
-                        "indexing": {
-                            "is_throttled": False,
-                            "throttle_time_in_millis": 0
-                        },
-                        "search": {
-                            "open_contexts": 0,
-                            "query_total": 0,
-                            "query_time_in_millis": 0
-                        },
-                        "merges": {
-                            "current": 0,
-                            "current_docs": 0,
-                            "current_size_in_bytes": 0
-                        },
-                        "refresh": {
-                            "total": 747,
-                            "total_time_in_millis": 277382,
-                            "listeners": 0
-                        },
-                        "query_cache": {
-                            "memory_size_in_bytes": 0,
-                            "total_count": 0,
-                            "hit_count": 0,
-                            "miss_count": 0,
-                            "cache_size": 0,
-                            "cache_count": 0,
-                            "evictions": 0
-                        },
-                        "fielddata": {
-                            "memory_size_in_bytes": 6936,
-                            "evictions": 17
-                        },
-                        "completion": {
-                            "size_in_bytes": 0
-                        },
-                        "segments": {
-                            "count": 0,
-                            "memory_in_bytes": 0,
-                            "max_unsafe_auto_id_timestamp": -9223372036854775808,
-                            "file_sizes": {}
-                        },
-                        "translog": {
-                            "operations": 0,
-                            "size_in_bytes": 0,
-                            "uncommitted_operations": 0,
-                            "uncommitted_size_in_bytes": 0
-                        },
-                        "request_cache": {
-                            "memory_size_in_bytes": 0,
-                            "evictions": 0,
-                            "hit_count": 0,
-                            "miss_count": 0
-                        },
-                        "recovery": {
-                            "current_as_source": 0,
-                            "current_as_target": 0,
-                            "throttle_time_in_millis": 0
-                        }
-                    },
-                    "jvm": {
-                        "buffer_pools": {
-                            "mapped": {
-                                "count": 7,
-                                "used_in_bytes": 3120,
-                                "total_capacity_in_bytes": 9999
-                            },
-                            "direct": {
-                                "count": 6,
-                                "used_in_bytes": 73868,
-                                "total_capacity_in_bytes": 73867
-                            }
-                        },
-                        "classes": {
-                            "current_loaded_count": 9992,
-                            "total_loaded_count": 9992,
-                            "total_unloaded_count": 0
-                        },
-                        "mem": {
-                            "heap_used_in_bytes": 119073552,
-                            "heap_used_percent": 19,
-                            "heap_committed_in_bytes": 626393088,
-                            "heap_max_in_bytes": 626393088,
-                            "non_heap_used_in_bytes": 110250424,
-                            "non_heap_committed_in_bytes": 118108160,
-                            "pools": {
-                                "young": {
-                                    "used_in_bytes": 66378576,
-                                    "max_in_bytes": 139591680,
-                                    "peak_used_in_bytes": 139591680,
-                                    "peak_max_in_bytes": 139591680
-                                },
-                                "survivor": {
-                                    "used_in_bytes": 358496,
-                                    "max_in_bytes": 17432576,
-                                    "peak_used_in_bytes": 17432576,
-                                    "peak_max_in_bytes": 17432576
-                                },
-                                "old": {
-                                    "used_in_bytes": 52336480,
-                                    "max_in_bytes": 469368832,
-                                    "peak_used_in_bytes": 52336480,
-                                    "peak_max_in_bytes": 469368832
-                                }
-                            }
-                        },
-                        "gc": {
-                            "collectors": {
-                                "young": {
-                                    "collection_count": 3,
-                                    "collection_time_in_millis": 309
-                                },
-                                "old": {
-                                    "collection_count": 2,
-                                    "collection_time_in_millis": 229
-                                }
-                            }
-                        }
-                    },
-                    "process": {
-                        "timestamp": 1526045135857,
-                        "open_file_descriptors": 312,
-                        "max_file_descriptors": 1048576,
-                        "cpu": {
-                            "percent": 10,
-                            "total_in_millis": 56520
-                        },
-                        "mem": {
-                            "total_virtual_in_bytes": 2472173568
-                        }
-                    },
-                    "thread_pool": {
-                        "generic": {
-                            "threads": 4,
-                            "queue": 0,
-                            "active": 0,
-                            "rejected": 0,
-                            "largest": 4,
-                            "completed": 8
-                        }
-                    },
-                    "transport": {
-                        "server_open": 12,
-                        "rx_count": 77,
-                        "rx_size_in_bytes": 98723498,
-                        "tx_count": 88,
-                        "tx_size_in_bytes": 23879803
-                    },
-                    "breakers": {
-                        "parent": {
-                            "limit_size_in_bytes": 726571417,
-                            "limit_size": "692.9mb",
-                            "estimated_size_in_bytes": 0,
-                            "estimated_size": "0b",
-                            "overhead": 1.0,
-                            "tripped": 0
-                        }
-                    },
-                    "indexing_pressure": {
-                        "memory": {
-                            "current": {
-                                "combined_coordinating_and_primary_in_bytes": 0,
-                                "coordinating_in_bytes": 0,
-                                "primary_in_bytes": 0,
-                                "replica_in_bytes": 0,
-                                "all_in_bytes": 0
-                            },
-                            "total": {
-                                "combined_coordinating_and_primary_in_bytes": 0,
-                                "coordinating_in_bytes": 0,
-                                "primary_in_bytes": 0,
-                                "replica_in_bytes": 0,
-                                "all_in_bytes": 0,
-                                "coordinating_rejections": 0,
-                                "primary_rejections": 0,
-                                "replica_rejections": 0
-                            }
-                        }
-                    }
-                }
-            }
-        }
-
-        client = Client(nodes=SubClient(stats=node_stats_response))
-        cfg = create_config()
-        metrics_store = metrics.EsMetricsStore(cfg)
-        node_name = [node_stats_response["nodes"][node]["name"] for node in node_stats_response["nodes"]][0]
-        metrics_store_meta_data = {"cluster": "remote", "node_name": node_name}
-        telemetry_params = {
-            "node-stats-include-indices-metrics": "refresh,docs"
-        }
-        recorder = telemetry.NodeStatsRecorder(telemetry_params, cluster_name="remote", client=client, metrics_store=metrics_store)
-        recorder.record()
-
-        metrics_store_put_doc.assert_called_once_with(
-            {"name": "node-stats",
-             "indices_docs_count": 76892364,
-             "indices_docs_deleted": 324530,
-             "indices_refresh_total": 747,
-             "indices_refresh_total_time_in_millis": 277382,
-             "indices_refresh_listeners": 0,
-             "thread_pool_generic_active": 0,
-             "thread_pool_generic_completed": 8,
-             "thread_pool_generic_largest": 4,
-             "thread_pool_generic_queue": 0,
-             "thread_pool_generic_rejected": 0,
-             "thread_pool_generic_threads": 4,
-             "breakers_parent_estimated_size_in_bytes": 0,
-             "breakers_parent_limit_size_in_bytes": 726571417,
-             "breakers_parent_overhead": 1.0,
-             "breakers_parent_tripped": 0,
-             "jvm_buffer_pools_direct_count": 6,
-             "jvm_buffer_pools_direct_total_capacity_in_bytes": 73867,
-             "jvm_buffer_pools_direct_used_in_bytes": 73868,
-             "jvm_buffer_pools_mapped_count": 7,
-             "jvm_buffer_pools_mapped_total_capacity_in_bytes": 9999,
-             "jvm_buffer_pools_mapped_used_in_bytes": 3120,
-             "jvm_mem_heap_committed_in_bytes": 626393088,
-             "jvm_mem_heap_max_in_bytes": 626393088,
-             "jvm_mem_heap_used_in_bytes": 119073552,
-             "jvm_mem_heap_used_percent": 19,
-             "jvm_mem_non_heap_committed_in_bytes": 118108160,
-             "jvm_mem_non_heap_used_in_bytes": 110250424,
-             "jvm_mem_pools_old_max_in_bytes": 469368832,
-             "jvm_mem_pools_old_peak_max_in_bytes": 469368832,
-             "jvm_mem_pools_old_peak_used_in_bytes": 52336480,
-             "jvm_mem_pools_old_used_in_bytes": 52336480,
-             "jvm_mem_pools_survivor_max_in_bytes": 17432576,
-             "jvm_mem_pools_survivor_peak_max_in_bytes": 17432576,
-             "jvm_mem_pools_survivor_peak_used_in_bytes": 17432576,
-             "jvm_mem_pools_survivor_used_in_bytes": 358496,
-             "jvm_mem_pools_young_max_in_bytes": 139591680,
-             "jvm_mem_pools_young_peak_max_in_bytes": 139591680,
-             "jvm_mem_pools_young_peak_used_in_bytes": 139591680,
-             "jvm_mem_pools_young_used_in_bytes": 66378576,
-             "jvm_gc_collectors_young_collection_count": 3,
-             "jvm_gc_collectors_young_collection_time_in_millis": 309,
-             "jvm_gc_collectors_old_collection_count": 2,
-             "jvm_gc_collectors_old_collection_time_in_millis": 229,
-             "transport_rx_count": 77,
-             "transport_rx_size_in_bytes": 98723498,
-             "transport_server_open": 12,
-             "transport_tx_count": 88,
-             "transport_tx_size_in_bytes": 23879803,
-             "process_cpu_percent": 10,
-             "process_cpu_total_in_millis": 56520,
-             "indexing_pressure_memory_current_combined_coordinating_and_primary_in_bytes": 0,
-             "indexing_pressure_memory_current_coordinating_in_bytes": 0,
-             "indexing_pressure_memory_current_primary_in_bytes": 0,
-             "indexing_pressure_memory_current_replica_in_bytes": 0,
-             "indexing_pressure_memory_current_all_in_bytes": 0,
-             "indexing_pressure_memory_total_combined_coordinating_and_primary_in_bytes": 0,
-             "indexing_pressure_memory_total_coordinating_in_bytes": 0,
-             "indexing_pressure_memory_total_primary_in_bytes": 0,
-             "indexing_pressure_memory_total_replica_in_bytes": 0,
-             "indexing_pressure_memory_total_all_in_bytes": 0,
-             "indexing_pressure_memory_total_coordinating_rejections": 0,
-             "indexing_pressure_memory_total_primary_rejections": 0,
-             "indexing_pressure_memory_total_replica_rejections": 0},
-            level=MetaInfoScope.node,
-            node_name="rally0",
-            meta_data=metrics_store_meta_data)
+    def test_stores_indices_metrics_from_nodes_stats(self):
+        client = Client(nodes=SubClient(stats=NODE_STATS_FULL_RESPONSE))
+        cases = [
+            ({"node-stats-include-indices": True}, NodeStatsRecorderTests.all_indices_stats_flattened),
+            ({"node-stats-include-indices-metrics": "refresh,docs"}, NodeStatsRecorderTests.selected_indices_stats_flattened)
+        ]
+        for telemetry_params, indices_stats_flattened in cases:
+            with self.subTest(telemetry_params=telemetry_params):
+                self.metrics_store.reset_mock()
+                recorder = telemetry.NodeStatsRecorder(telemetry_params, cluster_name="remote", client=client,
+                                                       metrics_store=self.metrics_store)
+                recorder.record()
+
+                expected_doc = {"name": "node-stats",
+                                **dict(indices_stats_flattened),
+                                **dict(NodeStatsRecorderTests.node_stats_flattened)}
+                self.assertEqual([self.node_stats_call(expected_doc)], self.metrics_store.put_doc.call_args_list)
 
     def test_exception_when_include_indices_metrics_not_valid(self):
         node_stats_response = {}
 
         client = Client(nodes=SubClient(stats=node_stats_response))
-        cfg = create_config()
-        metrics_store = metrics.EsMetricsStore(cfg)
         telemetry_params = {
             "node-stats-include-indices-metrics": {"bad": "input"}
         }
         with self.assertRaisesRegex(exceptions.SystemSetupError,
                                     "The telemetry parameter 'node-stats-include-indices-metrics' must be "
                                     "a comma-separated string but was <class 'dict'>"):
-            telemetry.NodeStatsRecorder(telemetry_params, cluster_name="remote", client=client, metrics_store=metrics_store)
+            telemetry.NodeStatsRecorder(telemetry_params, cluster_name="remote", client=client, metrics_store=self.metrics_store)
 
 
 class TransformStatsTests(TestCase):
@@ -1870,8 +1199,7 @@ class TransformStatsTests(TestCase):
         telemetry_params = {
             "transform-stats-sample-interval": -1 * random.random()
         }
-        with self.assertRaisesRegex(exceptions.SystemSetupError,
-                                    r"The telemetry parameter 'transform-stats-sample-interval' must be greater than zero but was .*\."):
+        with self.assertRaisesRegex(exceptions.SystemSetupError, non_positive_sample_interval_error("transform-stats-sample-interval")):
             telemetry.TransformStats(telemetry_params, clients, metrics_store)
 
     def test_wrong_cluster_name_in_transform_stats_indices_forbidden(self):
@@ -1885,10 +1213,7 @@ class TransformStatsTests(TestCase):
             }
         }
         with self.assertRaisesRegex(exceptions.SystemSetupError,
-                                    r"The telemetry parameter 'transform-stats-transforms' must be a JSON Object with keys matching "
-                                    r"the cluster names \[{}] specified in --target-hosts "
-                                    r"but it had \[wrong_cluster_name\].".format(",".join(sorted(clients.keys())))
-                                    ):
+                                    wrong_cluster_name_error("transform-stats-transforms", clients)):
             telemetry.TransformStats(telemetry_params, clients, metrics_store)
 
 
@@ -1972,11 +1297,10 @@ class TransformStatsRecorderTests(TestCase):
         ])
 
 
-class ClusterEnvironmentInfoTests(TestCase):
-    @mock.patch("esrally.metrics.EsMetricsStore.add_meta_info")
-    def test_stores_cluster_level_metrics_on_attach(self, metrics_store_add_meta_info):
-        nodes_info = {"nodes": collections.OrderedDict()}
-        nodes_info["nodes"]["FCFjozkeTiOpN-SI88YEcg"] = {
+# read-only as it is shared
+CLUSTER_NODES_INFO = deep_freeze({
+    "nodes": {
+        "FCFjozkeTiOpN-SI88YEcg": {
             "name": "rally0",
             "host": "127.0.0.1",
             "attributes": {
@@ -2000,8 +1324,8 @@ class ClusterEnvironmentInfoTests(TestCase):
                     "has_native_controller": False
                 }
             ]
-        }
-        nodes_info["nodes"]["EEEjozkeTiOpN-SI88YEcg"] = {
+        },
+        "EEEjozkeTiOpN-SI88YEcg": {
             "name": "rally1",
             "host": "127.0.0.1",
             "attributes": {
@@ -2026,7 +1350,13 @@ class ClusterEnvironmentInfoTests(TestCase):
                 }
             ]
         }
+    }
+})
 
+
+class ClusterEnvironmentInfoTests(TestCase):
+    @mock.patch("esrally.metrics.EsMetricsStore.add_meta_info")
+    def test_stores_cluster_level_metrics_on_attach(self, metrics_store_add_meta_info):
         cluster_info = {
             "version":
                 {
@@ -2036,7 +1366,7 @@ class ClusterEnvironmentInfoTests(TestCase):
         }
 
         cfg = create_config()
-        client = Client(nodes=SubClient(info=nodes_info), info=cluster_info)
+        client = static_client(cluster_info=cluster_info, nodes_info=CLUSTER_NODES_INFO)
         metrics_store = metrics.EsMetricsStore(cfg)
         env_device = telemetry.ClusterEnvironmentInfo(client, metrics_store)
         t = telemetry.Telemetry(cfg, devices=[env_device])
@@ -2104,106 +1434,57 @@ class NodeEnvironmentInfoTests(TestCase):
         metrics_store_add_meta_info.assert_has_calls(calls)
 
 
-class ExternalEnvironmentInfoTests(TestCase):
-    def setUp(self):
-        self.cfg = create_config()
-
-    @mock.patch("esrally.metrics.EsMetricsStore.add_meta_info")
-    def test_stores_all_node_metrics_on_attach(self, metrics_store_add_meta_info):
-        nodes_stats = {
-            "nodes": {
-                "FCFjozkeTiOpN-SI88YEcg": {
-                    "name": "rally0",
-                    "host": "127.0.0.1"
-                }
-            }
+# read-only as they are shared
+EXTERNAL_NODES_STATS = deep_freeze({
+    "nodes": {
+        "FCFjozkeTiOpN-SI88YEcg": {
+            "name": "rally0",
+            "host": "127.0.0.1"
         }
+    }
+})
 
-        nodes_info = {
-            "nodes": {
-                "FCFjozkeTiOpN-SI88YEcg": {
-                    "name": "rally0",
-                    "host": "127.0.0.1",
-                    "attributes": {
-                        "az": "us_east1"
-                    },
-                    "os": {
-                        "name": "Mac OS X",
-                        "version": "10.11.4",
-                        "available_processors": 8
-                    },
-                    "jvm": {
-                        "version": "1.8.0_74",
-                        "vm_vendor": "Oracle Corporation"
-                    },
-                    "plugins": [
-                        {
-                            "name": "ingest-geoip",
-                            "version": "5.0.0",
-                            "description": "Ingest processor that uses looksup geo data ...",
-                            "classname": "org.elasticsearch.ingest.geoip.IngestGeoIpPlugin",
-                            "has_native_controller": False
-                        }
-                    ]
-                }
-            }
-        }
-        cluster_info = {
-            "version":
+EXTERNAL_NODES_INFO = deep_freeze({
+    "nodes": {
+        "FCFjozkeTiOpN-SI88YEcg": {
+            "name": "rally0",
+            "host": "127.0.0.1",
+            "attributes": {
+                "az": "us_east1"
+            },
+            "os": {
+                "name": "Mac OS X",
+                "version": "10.11.4",
+                "available_processors": 8
+            },
+            "jvm": {
+                "version": "1.8.0_74",
+                "vm_vendor": "Oracle Corporation"
+            },
+            "plugins": [
                 {
-                    "build_hash": "253032b",
-                    "number": "5.0.0"
-
+                    "name": "ingest-geoip",
+                    "version": "5.0.0",
+                    "description": "Ingest processor that uses looksup geo data ...",
+                    "classname": "org.elasticsearch.ingest.geoip.IngestGeoIpPlugin",
+                    "has_native_controller": False
                 }
+            ]
         }
-        client = Client(nodes=SubClient(stats=nodes_stats, info=nodes_info), info=cluster_info)
-        metrics_store = metrics.EsMetricsStore(self.cfg)
-        env_device = telemetry.ExternalEnvironmentInfo(client, metrics_store)
-        t = telemetry.Telemetry(devices=[env_device])
-        t.on_benchmark_start()
+    }
+})
 
-        calls = [
-            mock.call(metrics.MetaInfoScope.node, "rally0", "node_name", "rally0"),
-            mock.call(metrics.MetaInfoScope.node, "rally0", "host_name", "127.0.0.1"),
-            mock.call(metrics.MetaInfoScope.node, "rally0", "os_name", "Mac OS X"),
-            mock.call(metrics.MetaInfoScope.node, "rally0", "os_version", "10.11.4"),
-            mock.call(metrics.MetaInfoScope.node, "rally0", "cpu_logical_cores", 8),
-            mock.call(metrics.MetaInfoScope.node, "rally0", "jvm_vendor", "Oracle Corporation"),
-            mock.call(metrics.MetaInfoScope.node, "rally0", "jvm_version", "1.8.0_74"),
-            mock.call(metrics.MetaInfoScope.node, "rally0", "plugins", ["ingest-geoip"]),
-            # these are automatically pushed up to cluster level (additionally) if all nodes match
-            mock.call(metrics.MetaInfoScope.cluster, None, "plugins", ["ingest-geoip"]),
-            mock.call(metrics.MetaInfoScope.node, "rally0", "attribute_az", "us_east1"),
-            mock.call(metrics.MetaInfoScope.cluster, None, "attribute_az", "us_east1"),
-        ]
-        metrics_store_add_meta_info.assert_has_calls(calls)
 
-    @mock.patch("esrally.metrics.EsMetricsStore.add_meta_info")
-    def test_fallback_when_host_not_available(self, metrics_store_add_meta_info):
-        nodes_stats = {
-            "nodes": {
-                "FCFjozkeTiOpN-SI88YEcg": {
-                    "name": "rally0",
-                }
-            }
-        }
+def without_node_keys(response, keys):
+    return {"nodes": {node_id: without_keys(node, *keys) for node_id, node in response["nodes"].items()}}
 
-        nodes_info = {
-            "nodes": {
-                "FCFjozkeTiOpN-SI88YEcg": {
-                    "name": "rally0",
-                    "os": {
-                        "name": "Mac OS X",
-                        "version": "10.11.4",
-                        "available_processors": 8
-                    },
-                    "jvm": {
-                        "version": "1.8.0_74",
-                        "vm_vendor": "Oracle Corporation"
-                    }
-                }
-            }
-        }
+
+class ExternalEnvironmentInfoTests(TestCase):
+    def setUp(self):
+        self.cfg = create_config()
+
+    @mock.patch("esrally.metrics.EsMetricsStore.add_meta_info")
+    def test_stores_node_metrics_on_attach(self, metrics_store_add_meta_info):
         cluster_info = {
             "version":
                 {
@@ -2212,22 +1493,39 @@ class ExternalEnvironmentInfoTests(TestCase):
 
                 }
         }
-        client = Client(nodes=SubClient(stats=nodes_stats, info=nodes_info), info=cluster_info)
         metrics_store = metrics.EsMetricsStore(self.cfg)
-        env_device = telemetry.ExternalEnvironmentInfo(client, metrics_store)
-        t = telemetry.Telemetry(self.cfg, devices=[env_device])
-        t.on_benchmark_start()
-
-        calls = [
-            mock.call(metrics.MetaInfoScope.node, "rally0", "node_name", "rally0"),
-            mock.call(metrics.MetaInfoScope.node, "rally0", "host_name", "unknown"),
-            mock.call(metrics.MetaInfoScope.node, "rally0", "os_name", "Mac OS X"),
-            mock.call(metrics.MetaInfoScope.node, "rally0", "os_version", "10.11.4"),
-            mock.call(metrics.MetaInfoScope.node, "rally0", "cpu_logical_cores", 8),
-            mock.call(metrics.MetaInfoScope.node, "rally0", "jvm_vendor", "Oracle Corporation"),
-            mock.call(metrics.MetaInfoScope.node, "rally0", "jvm_version", "1.8.0_74")
+        cases = [
+            ("all node metrics", (), "127.0.0.1", [
+                mock.call(metrics.MetaInfoScope.node, "rally0", "plugins", ["ingest-geoip"]),
+                # these are automatically pushed up to cluster level (additionally) if all nodes match
+                mock.call(metrics.MetaInfoScope.cluster, None, "plugins", ["ingest-geoip"]),
+                mock.call(metrics.MetaInfoScope.node, "rally0", "attribute_az", "us_east1"),
+                mock.call(metrics.MetaInfoScope.cluster, None, "attribute_az", "us_east1"),
+            ]),
+            # falls back to "unknown" if the host is not available
+            ("host not available", ("host", "attributes", "plugins"), "unknown", []),
         ]
-        metrics_store_add_meta_info.assert_has_calls(calls)
+        for description, omitted_keys, host_name, additional_calls in cases:
+            with self.subTest(description):
+                metrics_store_add_meta_info.reset_mock()
+                client = static_client(cluster_info=cluster_info,
+                                       nodes_info=without_node_keys(EXTERNAL_NODES_INFO, omitted_keys),
+                                       nodes_stats=without_node_keys(EXTERNAL_NODES_STATS, omitted_keys))
+                env_device = telemetry.ExternalEnvironmentInfo(client, metrics_store)
+                t = telemetry.Telemetry(self.cfg, devices=[env_device])
+                t.on_benchmark_start()
+
+                calls = [
+                    mock.call(metrics.MetaInfoScope.node, "rally0", "node_name", "rally0"),
+                    mock.call(metrics.MetaInfoScope.node, "rally0", "host_name", host_name),
+                    mock.call(metrics.MetaInfoScope.node, "rally0", "os_name", "Mac OS X"),
+                    mock.call(metrics.MetaInfoScope.node, "rally0", "os_version", "10.11.4"),
+                    mock.call(metrics.MetaInfoScope.node, "rally0", "cpu_logical_cores", 8),
+                    mock.call(metrics.MetaInfoScope.node, "rally0", "jvm_vendor", "Oracle Corporation"),
+                    mock.call(metrics.MetaInfoScope.node, "rally0", "jvm_version", "1.8.0_74"),
+                    *additional_calls
+                ]
+                metrics_store_add_meta_info.assert_has_calls(calls)
 
     @mock.patch("esrally.metrics.EsMetricsStore.add_meta_info")
     def test_resilient_if_error_response(self, metrics_store_add_meta_info):
@@ -2255,7 +1553,7 @@ class DiskIoTests(TestCase):
 
         device = telemetry.DiskIo(node_count_on_host=1)
         t = telemetry.Telemetry(enabled_devices=[], devices=[device])
-        node = cluster.Node(pid=None, binary_path="/bin", host_name="localhost", node_name="rally0", telemetry=t)
+        node = rally_node("rally0")
         t.attach_to_node(node)
         t.on_benchmark_start()
         # we assume that serializing and deserializing the telemetry device produces the same state
@@ -2285,7 +1583,7 @@ class DiskIoTests(TestCase):
 
         device = telemetry.DiskIo(node_count_on_host=2)
         t = telemetry.Telemetry(enabled_devices=[], devices=[device])
-        node = cluster.Node(pid=None, binary_path="/bin", host_name="localhost", node_name="rally0", telemetry=t)
+        node = rally_node("rally0")
         t.attach_to_node(node)
         t.on_benchmark_start()
         # we assume that serializing and deserializing the telemetry device produces the same state
@@ -2316,7 +1614,7 @@ class DiskIoTests(TestCase):
 
         device = telemetry.DiskIo(node_count_on_host=1)
         t = telemetry.Telemetry(enabled_devices=[], devices=[device])
-        node = cluster.Node(pid=None, binary_path="/bin", host_name="localhost", node_name="rally0", telemetry=t)
+        node = rally_node("rally0")
         t.attach_to_node(node)
         t.on_benchmark_start()
         # we assume that serializing and deserializing the telemetry device produces the same state
@@ -2332,18 +1630,9 @@ class DiskIoTests(TestCase):
 
 
 class JvmStatsSummaryTests(TestCase):
-    @mock.patch("esrally.metrics.EsMetricsStore.put_doc")
-    @mock.patch("esrally.metrics.EsMetricsStore.put_value_cluster_level")
-    @mock.patch("esrally.metrics.EsMetricsStore.put_value_node_level")
-    @mock.patch("esrally.metrics.EsMetricsStore.put_count_cluster_level")
-    @mock.patch("esrally.metrics.EsMetricsStore.put_count_node_level")
-    def test_stores_only_diff_of_gc_times(self,
-                                          metrics_store_count_node_level,
-                                          metrics_store_count_cluster_level,
-                                          metrics_store_node_level,
-                                          metrics_store_cluster_level,
-                                          metrics_store_put_doc):
-        nodes_stats_at_start = {
+    @staticmethod
+    def nodes_stats(young_peak, survivor_peak, old_peak, young_gc_time, young_gc_count, old_gc_time, old_gc_count):
+        return {
             "nodes": {
                 "FCFjozkeTiOpN-SI88YEcg": {
                     "name": "rally0",
@@ -2352,25 +1641,25 @@ class JvmStatsSummaryTests(TestCase):
                         "mem": {
                             "pools": {
                                 "young": {
-                                    "peak_used_in_bytes": 228432256,
+                                    "peak_used_in_bytes": young_peak,
                                 },
                                 "survivor": {
-                                    "peak_used_in_bytes": 3333333,
+                                    "peak_used_in_bytes": survivor_peak,
                                 },
                                 "old": {
-                                    "peak_used_in_bytes": 300008222,
+                                    "peak_used_in_bytes": old_peak,
                                 }
                             }
                         },
                         "gc": {
                             "collectors": {
                                 "old": {
-                                    "collection_time_in_millis": 1000,
-                                    "collection_count": 1
+                                    "collection_time_in_millis": old_gc_time,
+                                    "collection_count": old_gc_count
                                 },
                                 "young": {
-                                    "collection_time_in_millis": 500,
-                                    "collection_count": 20
+                                    "collection_time_in_millis": young_gc_time,
+                                    "collection_count": young_gc_count
                                 }
                             }
                         }
@@ -2379,72 +1668,37 @@ class JvmStatsSummaryTests(TestCase):
             }
         }
 
-        client = Client(nodes=SubClient(nodes_stats_at_start))
-        cfg = create_config()
+    def setUp(self):
+        self.metrics_store = mock.Mock(spec=metrics.EsMetricsStore)
 
-        metrics_store = metrics.EsMetricsStore(cfg)
-        device = telemetry.JvmStatsSummary(client, metrics_store)
-        t = telemetry.Telemetry(cfg, devices=[device])
-        t.on_benchmark_start()
-        # now we'd need to change the node stats response
-        nodes_stats_at_end = {
-            "nodes": {
-                "FCFjozkeTiOpN-SI88YEcg": {
-                    "name": "rally0",
-                    "host": "127.0.0.1",
-                    "jvm": {
-                        "mem": {
-                            "pools": {
-                                "young": {
-                                    "peak_used_in_bytes": 558432256,
-                                },
-                                "survivor": {
-                                    "peak_used_in_bytes": 69730304,
-                                },
-                                "old": {
-                                    "peak_used_in_bytes": 3084912096,
-                                }
-                            }
-                        },
-                        "gc": {
-                            "collectors": {
-                                "old": {
-                                    "collection_time_in_millis": 2500,
-                                    "collection_count": 2
-                                },
-                                "young": {
-                                    "collection_time_in_millis": 1200,
-                                    "collection_count": 4000
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-        }
-        client.nodes = SubClient(nodes_stats_at_end)
-        t.on_benchmark_stop()
+    def test_stores_only_diff_of_gc_times(self):
+        nodes_stats_at_start = self.nodes_stats(young_peak=228432256, survivor_peak=3333333, old_peak=300008222,
+                                                young_gc_time=500, young_gc_count=20, old_gc_time=1000, old_gc_count=1)
+        nodes_stats_at_end = self.nodes_stats(young_peak=558432256, survivor_peak=69730304, old_peak=3084912096,
+                                              young_gc_time=1200, young_gc_count=4000, old_gc_time=2500, old_gc_count=2)
 
-        metrics_store_node_level.assert_has_calls([
+        run_benchmark(telemetry.JvmStatsSummary, "nodes", nodes_stats_at_start, nodes_stats_at_end, self.metrics_store)
+
+        self.metrics_store.put_value_node_level.assert_has_calls([
             mock.call("rally0", "node_young_gen_gc_time", 700, "ms"),
             mock.call("rally0", "node_old_gen_gc_time", 1500, "ms"),
         ])
 
-        metrics_store_count_node_level.assert_has_calls([
+        self.metrics_store.put_count_node_level.assert_has_calls([
             mock.call("rally0", "node_young_gen_gc_count", 3980),
             mock.call("rally0", "node_old_gen_gc_count", 1),
         ])
 
-        metrics_store_cluster_level.assert_has_calls([
+        self.metrics_store.put_value_cluster_level.assert_has_calls([
             mock.call("node_total_young_gen_gc_time", 700, "ms"),
             mock.call("node_total_old_gen_gc_time", 1500, "ms")
         ])
-        metrics_store_count_cluster_level.assert_has_calls([
+        self.metrics_store.put_count_cluster_level.assert_has_calls([
             mock.call("node_total_young_gen_gc_count", 3980),
             mock.call("node_total_old_gen_gc_count", 1),
         ])
 
-        metrics_store_put_doc.assert_has_calls([
+        self.metrics_store.put_doc.assert_has_calls([
             mock.call({
                 "name": "jvm_memory_pool_stats",
                 "young": {
@@ -2463,254 +1717,78 @@ class JvmStatsSummaryTests(TestCase):
         ])
 
 
-class IndexStatsTests(TestCase):
-    @mock.patch("esrally.metrics.EsMetricsStore.put_doc")
-    @mock.patch("esrally.metrics.EsMetricsStore.put_value_cluster_level")
-    @mock.patch("esrally.metrics.EsMetricsStore.put_count_cluster_level")
-    def test_stores_available_index_stats(self, metrics_store_cluster_count, metrics_store_cluster_value, metrics_store_put_doc):
-        client = Client(indices=SubClient({
-            "_all": {
-                "primaries": {
-                    "segments": {
-                        "count": 0
-                    },
-                    "merges": {
-                        "total_time_in_millis": 0,
-                        "total_throttled_time_in_millis": 0,
-                        "total": 0
-                    },
-                    "indexing": {
-                        "index_time_in_millis": 0
-                    },
-                    "refresh": {
-                        "total_time_in_millis": 0,
-                        "total": 0
-                    },
-                    "flush": {
-                        "total_time_in_millis": 0,
-                        "total": 0
-                    }
-                }
-            }
-        }))
-        cfg = create_config()
-
-        metrics_store = metrics.EsMetricsStore(cfg)
-        device = telemetry.IndexStats(client, metrics_store)
-        t = telemetry.Telemetry(cfg, devices=[device])
-        t.on_benchmark_start()
-
-        response = {
-            "_all": {
-                "primaries": {
-                    "segments": {
-                        "count": 5,
-                        "memory_in_bytes": 2048,
-                        "stored_fields_memory_in_bytes": 1024,
-                        "doc_values_memory_in_bytes": 128,
-                        "terms_memory_in_bytes": 256,
-                        "points_memory_in_bytes": 512
-                    },
-                    "merges": {
-                        "total_time_in_millis": 509341,
-                        "total_throttled_time_in_millis": 98925,
-                        "total": 3
-                    },
-                    "indexing": {
-                        "index_time_in_millis": 1065688
-                    },
-                    "refresh": {
-                        "total_time_in_millis": 158465,
-                        "total": 10
-                    },
-                    "flush": {
-                        "total_time_in_millis": 0,
-                        "total": 0
-                    }
-                },
-                "total": {
-                    "store": {
-                        "size_in_bytes": 2113867510
-                    },
-                    "translog": {
-                        "operations": 6840000,
-                        "size_in_bytes": 2647984713,
-                        "uncommitted_operations": 0,
-                        "uncommitted_size_in_bytes": 430
-                    }
-                }
-            },
-            "indices": {
-                "idx-001": {
-                    "shards": {
-                        "0": [
-                            {
-                                "routing": {
-                                    "primary": False
-                                },
-                                "indexing": {
-                                    "index_total": 2280171,
-                                    "index_time_in_millis": 533662,
-                                    "throttle_time_in_millis": 0
-                                },
-                                "merges": {
-                                    "total_time_in_millis": 280689,
-                                    "total_stopped_time_in_millis": 0,
-                                    "total_throttled_time_in_millis": 58846,
-                                    "total_auto_throttle_in_bytes": 8085428
-                                },
-                                "refresh": {
-                                    "total_time_in_millis": 81004
-                                },
-                                "flush": {
-                                    "total_time_in_millis": 0
-                                }
-                            }
-                        ],
-                        "1": [
-                            {
-                                "routing": {
-                                    "primary": True,
-                                },
-                                "indexing": {
-                                    "index_time_in_millis": 532026,
-                                },
-                                "merges": {
-                                    "total_time_in_millis": 228652,
-                                    "total_throttled_time_in_millis": 40079,
-                                },
-                                "refresh": {
-                                    "total_time_in_millis": 77461,
-                                },
-                                "flush": {
-                                    "total_time_in_millis": 0
-                                }
-                            }
-                        ]
-                    }
-                },
-                "idx-002": {
-                    "shards": {
-                        "0": [
-                            {
-                                "routing": {
-                                    "primary": True,
-                                },
-                                "indexing": {
-                                    "index_time_in_millis": 533662,
-                                },
-                                "merges": {
-                                    "total_time_in_millis": 280689,
-                                    "total_throttled_time_in_millis": 58846,
-                                },
-                                "refresh": {
-                                    "total_time_in_millis": 81004,
-                                },
-                                "flush": {
-                                    "total_time_in_millis": 0
-                                }
-                            }
-                        ],
-                        "1": [
-                            {
-                                "routing": {
-                                    "primary": False,
-                                },
-                                "indexing": {
-                                    "index_time_in_millis": 532026,
-                                    "throttle_time_in_millis": 296
-                                },
-                                "merges": {
-                                    "total_time_in_millis": 228652,
-                                    "total_throttled_time_in_millis": 40079,
-                                },
-                                "refresh": {
-                                    "total_time_in_millis": 77461,
-                                },
-                                "flush": {
-                                    "total_time_in_millis": 0
-                                }
-                            }
-                        ]
-                    }
-                }
-            }
-        }
+# read-only as they are shared
+INDEX_STATS_START_RESPONSE = deep_freeze(load_json_resource("index_stats_start.json"))
+INDEX_STATS_END_RESPONSE = deep_freeze(load_json_resource("index_stats_end.json"))
+
+# expected metrics store calls for INDEX_STATS_END_RESPONSE
+INDEX_STATS_EXPECTED_CALLS = (
+    mock.call.put_doc(doc={
+        "name": "merges_total_time",
+        "value": 509341,
+        "unit": "ms",
+        "per-shard": UnorderedList([228652, 280689])
+    }, level=metrics.MetaInfoScope.cluster),
+    mock.call.put_doc(doc={
+        "name": "merges_total_throttled_time",
+        "value": 98925,
+        "unit": "ms",
+        "per-shard": UnorderedList([40079, 58846])
+    }, level=metrics.MetaInfoScope.cluster),
+    mock.call.put_doc(doc={
+        "name": "indexing_total_time",
+        "value": 1065688,
+        "unit": "ms",
+        "per-shard": UnorderedList([532026, 533662])
+    }, level=metrics.MetaInfoScope.cluster),
+    mock.call.put_doc(doc={
+        "name": "refresh_total_time",
+        "value": 158465,
+        "unit": "ms",
+        "per-shard": UnorderedList([77461, 81004])
+    }, level=metrics.MetaInfoScope.cluster),
+    mock.call.put_doc(doc={
+        "name": "flush_total_time",
+        "value": 0,
+        "unit": "ms",
+        "per-shard": UnorderedList([0, 0])
+    }, level=metrics.MetaInfoScope.cluster),
+    mock.call.put_doc(doc={
+        "name": "merges_total_count",
+        "value": 3
+    }, level=metrics.MetaInfoScope.cluster),
+    mock.call.put_doc(doc={
+        "name": "refresh_total_count",
+        "value": 10
+    }, level=metrics.MetaInfoScope.cluster),
+    mock.call.put_doc(doc={
+        "name": "flush_total_count",
+        "value": 0
+    }, level=metrics.MetaInfoScope.cluster),
+    mock.call.put_count_cluster_level("segments_count", 5),
+    mock.call.put_value_cluster_level("segments_memory_in_bytes", 2048, "byte"),
+    mock.call.put_value_cluster_level("segments_doc_values_memory_in_bytes", 128, "byte"),
+    mock.call.put_value_cluster_level("segments_stored_fields_memory_in_bytes", 1024, "byte"),
+    mock.call.put_value_cluster_level("segments_terms_memory_in_bytes", 256, "byte"),
+    # we don't have norms, so nothing should have been called
+    mock.call.put_value_cluster_level("store_size_in_bytes", 2113867510, "byte"),
+    mock.call.put_value_cluster_level("translog_size_in_bytes", 2647984713, "byte"),
+)
 
-        client.indices = SubClient(response)
 
-        t.on_benchmark_stop()
+class IndexStatsTests(TestCase):
+    def test_stores_available_index_stats(self):
+        metrics_store = mock.Mock(spec=metrics.EsMetricsStore)
 
-        # we cannot rely on stable iteration order so we need to extract the values at runtime from the dict
-        primary_shards = []
-        for shards in response["indices"].values():
-            for shard in shards["shards"].values():
-                for shard_metrics in shard:
-                    if shard_metrics["routing"]["primary"]:
-                        primary_shards.append(shard_metrics)
+        run_benchmark(telemetry.IndexStats, "indices", INDEX_STATS_START_RESPONSE, INDEX_STATS_END_RESPONSE, metrics_store)
 
-        metrics_store_put_doc.assert_has_calls([
-            mock.call(doc={
-                "name": "merges_total_time",
-                "value": 509341,
-                "unit": "ms",
-                # [228652, 280689]
-                "per-shard": [s["merges"]["total_time_in_millis"] for s in primary_shards]
-            }, level=metrics.MetaInfoScope.cluster),
-            mock.call(doc={
-                "name": "merges_total_throttled_time",
-                "value": 98925,
-                "unit": "ms",
-                # [40079, 58846]
-                "per-shard": [s["merges"]["total_throttled_time_in_millis"] for s in primary_shards]
-            }, level=metrics.MetaInfoScope.cluster),
-            mock.call(doc={
-                "name": "indexing_total_time",
-                "value": 1065688,
-                "unit": "ms",
-                # [532026, 533662]
-                "per-shard": [s["indexing"]["index_time_in_millis"] for s in primary_shards]
-            }, level=metrics.MetaInfoScope.cluster),
-            mock.call(doc={
-                "name": "refresh_total_time",
-                "value": 158465,
-                "unit": "ms",
-                # [77461, 81004]
-                "per-shard": [s["refresh"]["total_time_in_millis"] for s in primary_shards]
-            }, level=metrics.MetaInfoScope.cluster),
-            mock.call(doc={
-                "name": "flush_total_time",
-                "value": 0,
-                "unit": "ms",
-                # [0, 0]
-                "per-shard": [s["flush"]["total_time_in_millis"] for s in primary_shards]
-            }, level=metrics.MetaInfoScope.cluster),
-            mock.call(doc={
-                "name": "merges_total_count",
-                "value": 3
-            }, level=metrics.MetaInfoScope.cluster),
-            mock.call(doc={
-                "name": "refresh_total_count",
-                "value": 10
-            }, level=metrics.MetaInfoScope.cluster),
-            mock.call(doc={
-                "name": "flush_total_count",
-                "value": 0
-            }, level=metrics.MetaInfoScope.cluster),
-        ])
+        metrics_store.assert_has_calls(INDEX_STATS_EXPECTED_CALLS, any_order=True)
 
-        metrics_store_cluster_count.assert_has_calls([
-            mock.call("segments_count", 5)
-        ])
-        metrics_store_cluster_value.assert_has_calls([
-            mock.call("segments_memory_in_bytes", 2048, "byte"),
-            mock.call("segments_doc_values_memory_in_bytes", 128, "byte"),
-            mock.call("segments_stored_fields_memory_in_bytes", 1024, "byte"),
-            mock.call("segments_terms_memory_in_bytes", 256, "byte"),
-            # we don't have norms, so nothing should have been called
-            mock.call("store_size_in_bytes", 2113867510, "byte"),
-            mock.call("translog_size_in_bytes", 2647984713, "byte"),
-        ], any_order=True)
+    def test_does_not_look_up_primary_shards_without_index_times(self):
+        device = telemetry.IndexStats(Client(), mock.Mock(spec=metrics.EsMetricsStore))
+        with mock.patch.object(device, "primary_shards") as primary_shards:
+            self.assertEqual([], device.index_times({"_all": {"primaries": {}}}))
+        primary_shards.assert_not_called()
 
 
 class MlBucketProcessingTimeTests(TestCase):
@@ -2821,46 +1899,42 @@ class MlBucketProcessingTimeTests(TestCase):
 
 
 class IndexSizeTests(TestCase):
+    def setUp(self):
+        self.metrics_store = mock.Mock(spec=metrics.EsMetricsStore)
+
     @mock.patch("esrally.utils.io.get_size")
-    @mock.patch("esrally.metrics.EsMetricsStore.put_count_node_level")
-    def test_stores_index_size_for_data_paths(self, metrics_store_node_count, get_size):
+    def test_stores_index_size_for_data_paths(self, get_size):
         get_size.side_effect = [2048, 16384]
 
-        cfg = create_config()
-        metrics_store = metrics.EsMetricsStore(cfg)
         device = telemetry.IndexSize(["/var/elasticsearch/data/1", "/var/elasticsearch/data/2"])
         t = telemetry.Telemetry(enabled_devices=[], devices=[device])
-        node = cluster.Node(pid=None, binary_path="/bin", host_name="localhost", node_name="rally-node-0", telemetry=t)
+        node = rally_node("rally-node-0")
         t.attach_to_node(node)
         t.on_benchmark_start()
         t.on_benchmark_stop()
         t.detach_from_node(node, running=True)
         t.detach_from_node(node, running=False)
-        t.store_system_metrics(node, metrics_store)
+        t.store_system_metrics(node, self.metrics_store)
 
-        metrics_store_node_count.assert_has_calls([
+        self.metrics_store.put_count_node_level.assert_has_calls([
             mock.call("rally-node-0", "final_index_size_bytes", 18432, "byte")
         ])
 
     @mock.patch("esrally.utils.io.get_size")
-    @mock.patch("esrally.metrics.EsMetricsStore.put_count_cluster_level")
     @mock.patch("esrally.utils.process.run_subprocess_with_logging")
-    def test_stores_nothing_if_no_data_path(self, run_subprocess, metrics_store_cluster_count, get_size):
+    def test_stores_nothing_if_no_data_path(self, run_subprocess, get_size):
         get_size.return_value = 2048
 
-        cfg = create_config()
-
-        metrics_store = metrics.EsMetricsStore(cfg)
         device = telemetry.IndexSize(data_paths=[])
         t = telemetry.Telemetry(devices=[device])
-        node = cluster.Node(pid=None, binary_path="/bin", host_name="localhost", node_name="rally-node-0", telemetry=t)
+        node = rally_node("rally-node-0")
         t.attach_to_node(node)
         t.on_benchmark_start()
         t.on_benchmark_stop()
         t.detach_from_node(node, running=True)
         t.detach_from_node(node, running=False)
-        t.store_system_metrics(node, metrics_store)
+        t.store_system_metrics(node, self.metrics_store)
 
         self.assertEqual(0, run_subprocess.call_count)
-        self.assertEqual(0, metrics_store_cluster_count.call_count)
+        self.assertEqual([], self.metrics_store.mock_calls)
         self.assertEqual(0, get_size.call_count)